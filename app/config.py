@@ -10,12 +10,88 @@ class Config:
     
     # 快取設定
     CACHE_EXPIRE_MINUTES = int(os.getenv("CACHE_EXPIRE_MINUTES", "30"))
-    MAX_CACHE_SIZE = int(os.getenv("MAX_CACHE_SIZE", "1000"))
+    MAX_CACHE_BYTES = int(os.getenv("MAX_CACHE_BYTES", str(64 * 1024 * 1024)))  # 記憶體快取的位元組上限（以序列化大小估算）
+    MAX_CACHE_SIZE = int(os.getenv("MAX_CACHE_SIZE", "0"))  # 額外的項目數上限，0 為不限制
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "tiered").lower()  # tiered（記憶體 + 本機 SQLite）、memory（僅記憶體）或 redis（多 worker 共用）
+    CACHE_L2_PATH = os.getenv("CACHE_L2_PATH", ".cache/results.sqlite3")  # 分層快取的 SQLite 檔案
+    CACHE_L2_MAX_ITEMS = int(os.getenv("CACHE_L2_MAX_ITEMS", "100000"))
+    CACHE_WARM_START_ITEMS = int(os.getenv("CACHE_WARM_START_ITEMS", "200"))  # 啟動時預先載入記憶體的熱門項目數
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_REDIS_TIMEOUT_SECONDS = float(os.getenv("CACHE_REDIS_TIMEOUT_SECONDS", "0.5"))
+    CACHE_REDIS_BACKOFF_SECONDS = float(os.getenv("CACHE_REDIS_BACKOFF_SECONDS", "15"))  # Redis 連線失敗後略過快取存取的秒數
+    CACHE_REDIS_LEN_CACHE_SECONDS = float(os.getenv("CACHE_REDIS_LEN_CACHE_SECONDS", "60"))  # 統計用的鍵值數量（SCAN）重新計算間隔
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "price_crawler:")
+    NEGATIVE_CACHE_TTL_SECONDS = int(os.getenv("NEGATIVE_CACHE_TTL_SECONDS", "300"))  # 商店確定沒有結果時，在此期間內不再重複查詢（0 為停用）
+    POPULARITY_CAPACITY = int(os.getenv("POPULARITY_CAPACITY", "1000"))  # 熱門查詢統計最多追蹤的查詢數
+    POPULARITY_HALF_LIFE_MINUTES = int(os.getenv("POPULARITY_HALF_LIFE_MINUTES", "60"))  # 查詢次數減半的間隔
+    CACHE_WARMER_ENABLED = os.getenv("CACHE_WARMER_ENABLED", "true").lower() == "true"
+    CACHE_WARM_TOP_N = int(os.getenv("CACHE_WARM_TOP_N", "100"))  # 背景預熱的熱門查詢數
+    CACHE_WARM_INTERVAL_SECONDS = int(os.getenv("CACHE_WARM_INTERVAL_SECONDS", "60"))
+    CACHE_WARM_LEAD_SECONDS = int(os.getenv("CACHE_WARM_LEAD_SECONDS", "120"))  # 快取到期前多久開始預熱
+    CACHE_WARM_MIN_COUNT = float(os.getenv("CACHE_WARM_MIN_COUNT", "3"))  # 保證查詢次數（扣除誤差）達此值才預熱，冷卻到此值以下即停止追蹤
+    CACHE_STALE_MAX_MINUTES = int(os.getenv("CACHE_STALE_MAX_MINUTES", "30"))  # 過期後仍可先回傳並背景更新的時間，超過則同步重新爬取（0 為停用）
+    # 各商店搜尋結果的快取時間（分鐘），未列出的商店使用 CACHE_EXPIRE_MINUTES
+    STORE_CACHE_TTL_MINUTES = {
+        "coolpc": int(os.getenv("STORE_CACHE_TTL_COOLPC", "60")),      # 原價屋（整頁價格表，更新頻率低）
+        "pchome": int(os.getenv("STORE_CACHE_TTL_PCHOME", "10")),      # PChome 24h購物（價格變動頻繁）
+        "sapphire": int(os.getenv("STORE_CACHE_TTL_SAPPHIRE", "60")),  # 藍寶石官網
+    }
     
     # 爬蟲設定
-    REQUEST_DELAY = int(os.getenv("REQUEST_DELAY", "1"))  # 減少延遲
+    REQUEST_DELAY = int(os.getenv("REQUEST_DELAY", "1"))  # 被要求降速（429/503）且未指定 Retry-After 時的暫停秒數
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))      # 減少重試次數
     TIMEOUT_SECONDS = int(os.getenv("TIMEOUT_SECONDS", "15"))  # 減少超時時間
+    SEARCH_DEADLINE_MS = int(os.getenv("SEARCH_DEADLINE_MS", "20000"))  # 單次搜尋的總時限，逾時商店回傳部分結果
+    DTSOURCE_DETAIL_CHECK_LIMIT = int(os.getenv("DTSOURCE_DETAIL_CHECK_LIMIT", "12"))  # 德源電腦每次搜尋最多檢查幾個商品詳細頁（合購限定標示），其餘只依名稱判斷
+    COOLPC_CATALOG_REFRESH_MINUTES = int(os.getenv("COOLPC_CATALOG_REFRESH_MINUTES", "60"))  # 原價屋價格表快照的定時更新間隔（0 為停用定時更新）
+    COOLPC_CATALOG_MAX_AGE_MINUTES = int(os.getenv("COOLPC_CATALOG_MAX_AGE_MINUTES", "120"))  # 快照超過此時間時，搜尋會先同步更新
+    COOLPC_CATALOG_RETRY_SECONDS = int(os.getenv("COOLPC_CATALOG_RETRY_SECONDS", "60"))  # 價格表下載或解析失敗後，多久內不再重試（沿用舊快照）
+    COOLPC_PRICE_EVENT_LIMIT = int(os.getenv("COOLPC_PRICE_EVENT_LIMIT", "5000"))  # 保留的原價屋價格變動事件數量
+    
+    # 產品匹配設定
+    SIMILARITY_KERNEL = os.getenv("SIMILARITY_KERNEL", "indel").lower()  # 基本相似度演算法：indel（位元平行編輯距離）、sequence（原本的 difflib）、token_set 或 ngram
+    
+    # 斷路器設定
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "3"))  # 連續失敗幾次後開啟
+    CIRCUIT_BREAKER_RECOVERY_SECONDS = int(os.getenv("CIRCUIT_BREAKER_RECOVERY_SECONDS", "60"))   # 開啟後多久進入半開試探
+    
+    # 連線池設定
+    HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+    HTTP_POOL_KEEPALIVE_SECONDS = int(os.getenv("HTTP_POOL_KEEPALIVE_SECONDS", "60"))
+    HTTP_VALIDATOR_CACHE_SIZE = int(os.getenv("HTTP_VALIDATOR_CACHE_SIZE", "200"))  # ETag/Last-Modified 快取數量
+    
+    # 限速設定：rate 為每秒令牌數、burst 為令牌桶容量、concurrency 為同時連線上限
+    RATE_LIMIT_DEFAULTS = {
+        "rate": float(os.getenv("RATE_LIMIT_RATE", "2")),
+        "burst": int(os.getenv("RATE_LIMIT_BURST", "4")),
+        "concurrency": int(os.getenv("RATE_LIMIT_CONCURRENCY", "4")),
+    }
+    HOST_RATE_LIMITS = {
+        "www.coolpc.com.tw": {"rate": 0.5, "burst": 2, "concurrency": 2},         # 原價屋（整頁價格表，頁面大）
+        "24h.pchome.com.tw": {"rate": 3.0, "burst": 6, "concurrency": 6},         # PChome 24h購物
+        "www.mypc.com.tw": {"rate": 2.0, "burst": 6, "concurrency": 4},           # 德源電腦（含詳細頁檢查）
+        "www.sinya.com.tw": {"rate": 2.0, "burst": 6, "concurrency": 4},          # 欣亞數位（含詳細頁檢查）
+        "www.autobuy.tw": {"rate": 1.0, "burst": 3, "concurrency": 2},            # AUTOBUY購物中心
+        "www.isunfar.com.tw": {"rate": 1.0, "burst": 3, "concurrency": 2},        # 順發電腦
+        "sapphiretech.cyberbiz.co": {"rate": 1.0, "burst": 3, "concurrency": 2},  # 藍寶石官網
+        "www.momoshop.com.tw": {"rate": 0.5, "burst": 1, "concurrency": 1},       # momo購物網（反機器人檢測嚴格）
+    }
+    
+    # 原始回應磁碟快取設定（秒）
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", ".cache/responses")
+    RESPONSE_CACHE_DEFAULT_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_DEFAULT_TTL_SECONDS", "300"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 磁碟快取總大小上限，超過時刪除最舊的檔案
+    RESPONSE_CACHE_SWEEP_EVERY_WRITES = int(os.getenv("RESPONSE_CACHE_SWEEP_EVERY_WRITES", "200"))  # 每寫入幾個檔案清理一次過期與超量的檔案
+    RESPONSE_CACHE_TTLS = {
+        "www.coolpc.com.tw": int(os.getenv("RESPONSE_CACHE_TTL_COOLPC", "3000")),       # 原價屋整頁價格表（略短於價格表快照的更新間隔）
+        "24h.pchome.com.tw": int(os.getenv("RESPONSE_CACHE_TTL_PCHOME", "300")),        # PChome 24h購物
+        "www.mypc.com.tw": int(os.getenv("RESPONSE_CACHE_TTL_DTSOURCE", "900")),        # 德源電腦
+        "www.sinya.com.tw": int(os.getenv("RESPONSE_CACHE_TTL_SINYA", "600")),          # 欣亞數位
+        "www.autobuy.tw": int(os.getenv("RESPONSE_CACHE_TTL_AUTOBUY", "600")),          # AUTOBUY購物中心
+        "www.isunfar.com.tw": int(os.getenv("RESPONSE_CACHE_TTL_SUNFAR", "600")),       # 順發電腦
+        "sapphiretech.cyberbiz.co": int(os.getenv("RESPONSE_CACHE_TTL_SAPPHIRE", "1800")),  # 藍寶石官網
+    }
     
     # Selenium 設定
     WEBDRIVER_PATH = os.getenv("WEBDRIVER_PATH", "")
@@ -1,13 +1,23 @@
 import asyncio
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException, Query
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import Config
-from app.models.product import Product, SearchResult, SearchResponse
+from app.models.product import Product, SearchResponse
 from app.utils.cache import CacheManager
-from app.utils.product_matcher import ProductMatcher
-from app.scrapers.coolpc import CoolPCScraper
+from app.utils.product_matcher import ProductMatcher, CATEGORY_PATTERNS
+from app.utils.http_pool import HttpSessionPool
+from app.utils.http_cache import ValidatorCache, ResponseCache
+from app.utils.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.single_flight import SingleFlight
+from app.utils.popularity import PopularityTracker
+from app.utils.result_index import ResultIndex, encode_products
+from app.scrapers.coolpc import CoolPCScraper, coolpc_catalog
 from app.scrapers.dtsource import DTSourceScraper
 from app.scrapers.autobuy import AutobuyScraper
 from app.scrapers.sinya import SinyaScraper
@@ -18,11 +28,49 @@ from app.scrapers.pchome import PChomeScraper
 # from app.scrapers.momo import MomoScraper
 # from app.scrapers.gh3c import GH3CScraper
 
+# 初始化元件
+config = Config()
+cache_manager = CacheManager()
+product_matcher = ProductMatcher()
+session_pool = HttpSessionPool()  # 所有爬蟲共用的長連線HTTP會話池
+validator_cache = ValidatorCache()  # 條件式請求的 ETag / Last-Modified 記錄
+response_cache = ResponseCache() if config.RESPONSE_CACHE_ENABLED else None  # 壓縮的原始回應磁碟快取
+rate_limiter = RateLimiter()  # 依主機的令牌桶限速與並行上限
+search_flight = SingleFlight()  # 合併相同查詢的並行搜尋
+page_flight = SingleFlight()  # 合併相同商品詳細頁的並行請求
+revalidation_tasks: Dict[str, asyncio.Task] = {}  # 進行中的背景更新（過期快取先回傳後更新）
+popularity_tracker = PopularityTracker(config.POPULARITY_CAPACITY, config.POPULARITY_HALF_LIFE_MINUTES * 60, config.CACHE_WARM_MIN_COUNT)  # 熱門查詢統計
+warmer_stats = {"runs": 0, "refreshed_queries": 0, "last_run": None}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """應用程式生命週期：啟動時預熱快取，結束時關閉共用連線池"""
+    warmed = await cache_manager.run(cache_manager.warm_start)
+    if warmed:
+        print(f"快取預熱：載入 {warmed} 個熱門項目")
+    if response_cache is not None:
+        swept = await response_cache.sweep()
+        if swept:
+            print(f"回應磁碟快取：清理 {swept} 個過期或超量的檔案")
+    background_tasks = []
+    if config.CACHE_WARMER_ENABLED:
+        background_tasks.append(asyncio.create_task(cache_warmer()))
+    if "coolpc" in SCRAPERS and config.COOLPC_CATALOG_REFRESH_MINUTES > 0:
+        background_tasks.append(asyncio.create_task(coolpc_catalog_refresher()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    for task in list(revalidation_tasks.values()):
+        task.cancel()
+    await session_pool.close()
+    await cache_manager.run(cache_manager.close)
+
 # 初始化FastAPI應用程式
 app = FastAPI(
     title="電腦產品比價系統 API",
     description="即時搜尋台灣電腦產品價格的比價系統",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 添加CORS中介軟體
@@ -34,11 +82,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 初始化元件
-config = Config()
-cache_manager = CacheManager()
-product_matcher = ProductMatcher()
-
 # 爬蟲映射
 SCRAPERS = {
     "dtsource": DTSourceScraper,   # 德源電腦
@@ -53,6 +96,9 @@ SCRAPERS = {
     "coolpc": CoolPCScraper,       # 原價屋
 }
 
+# 每個商店一個斷路器，商店故障時直接跳過
+circuit_breakers = {store_key: CircuitBreaker(store_key) for store_key in SCRAPERS}
+
 @app.get("/")
 async def root():
     """根路徑"""
@@ -62,99 +108,292 @@ async def root():
         "endpoints": {
             "search": "/api/search?product={產品名稱}",
             "health": "/health",
-            "cache_stats": "/api/cache/stats"
+            "cache_stats": "/api/cache/stats",
+            "coolpc_price_events": "/api/coolpc/price-events"
         }
     }
 
 @app.get("/health")
 async def health_check():
     """健康檢查"""
+    breaker_states = {store_key: breaker.get_state() for store_key, breaker in circuit_breakers.items()}
+    any_open = any(state["state"] != CircuitBreaker.CLOSED for state in breaker_states.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if any_open else "healthy",
         "timestamp": datetime.now().isoformat(),
-        "scrapers": list(SCRAPERS.keys())
+        "scrapers": list(SCRAPERS.keys()),
+        "http_pool": session_pool.get_stats(),
+        "rate_limits": rate_limiter.get_stats(),
+        "circuit_breakers": breaker_states
     }
 
 @app.get("/api/cache/stats")
 async def get_cache_stats():
     """取得快取統計資訊"""
-    return cache_manager.get_stats()
+    stats = await cache_manager.run(cache_manager.get_stats)
+    stats["http_validators"] = validator_cache.get_stats()
+    if response_cache is not None:
+        stats["http_responses"] = response_cache.get_stats()
+    stats["single_flight"] = {
+        "searches": search_flight.get_stats(),
+        "pages": page_flight.get_stats()
+    }
+    stats["revalidating"] = len(revalidation_tasks)
+    stats["popularity"] = popularity_tracker.get_stats()
+    stats["warmer"] = warmer_stats
+    stats["coolpc_catalog"] = coolpc_catalog.get_stats()
+    return stats
+
+@app.get("/api/coolpc/price-events")
+async def get_coolpc_price_events(
+    limit: int = Query(100, ge=1, le=1000, description="最多回傳的事件數量"),
+    event: Optional[str] = Query(None, description="事件類型：changed、added、removed")
+):
+    """取得原價屋價格表快照之間的價格變動事件（最新的在前）"""
+    return {
+        "last_diff": coolpc_catalog.last_diff,
+        "events": coolpc_catalog.get_events(limit, event)
+    }
 
 @app.delete("/api/cache")
 async def clear_cache():
     """清空快取"""
-    cache_manager.clear()
+    await cache_manager.run(cache_manager.clear)
+    validator_cache.clear()
+    if response_cache is not None:
+        response_cache.clear()
     return {"message": "快取已清空"}
 
-async def scrape_single_store(scraper_class, product_name: str, standalone_only: bool = False) -> List[Product]:
-    """搜尋單一商店"""
+def create_scraper(scraper_class, priority: int = PRIORITY_INTERACTIVE, deadline: Optional[float] = None):
+    """建立注入共用HTTP元件的爬蟲"""
+    return scraper_class(
+        session_pool=session_pool,
+        validator_cache=validator_cache,
+        response_cache=response_cache,
+        rate_limiter=rate_limiter,
+        priority=priority,
+        deadline=deadline,
+        page_flight=page_flight
+    )
+
+def store_categories(category: Optional[str]) -> Dict[str, str]:
+    """指定分類時，可依分類搜尋的商店 → 分類（這些商店的結果與快取依分類區分）"""
+    if category is None:
+        return {}
+    return {store_key: category for store_key, scraper_class in SCRAPERS.items() if scraper_class.supports_category}
+
+def search_key(product_name: str, store_keys: List[str], categories: Optional[Dict[str, str]] = None) -> str:
+    """合併並行搜尋與背景更新用的鍵值：查詢標準形式、商店與各商店的分類"""
+    categories = categories or {}
+    scopes = [f"{store_key}:{categories[store_key]}" if store_key in categories else store_key for store_key in store_keys]
+    return f"{product_matcher.canonicalize_query(product_name)}|{','.join(scopes)}"
+
+async def scrape_single_store(store_key: str, scraper_class, product_name: str, deadline: Optional[float] = None, priority: int = PRIORITY_INTERACTIVE, category: Optional[str] = None) -> Optional[List[Product]]:
+    """搜尋單一商店（包含組合商品，以 is_bundle 標記），並將結果回報給該商店的斷路器
+
+    商店無法連線或發生錯誤時回傳None，與「確定沒有結果」的空串列區分。
+    """
+    breaker = circuit_breakers[store_key]
+    scraper = None
     try:
-        async with scraper_class() as scraper:
+        scraper = create_scraper(scraper_class, priority=priority, deadline=deadline)
+        async with scraper:
             print(f"正在搜尋商品型號 {product_name} - {scraper_class.__name__}")
             
-            # 對於德源電腦，支援過濾合購限定商品
-            if scraper_class.__name__ == 'DTSourceScraper' and hasattr(scraper, 'search_products'):
-                products = await scraper.search_products(product_name, check_bundle_only=standalone_only)
-            # 對於欣亞數位，支援過濾組合商品
-            elif scraper_class.__name__ == 'SinyaScraper' and hasattr(scraper, 'search_products'):
-                products = await scraper.search_products(product_name, standalone_only=standalone_only)
-            # 對於PChome，支援過濾組合包商品
-            elif scraper_class.__name__ == 'PChomeScraper' and hasattr(scraper, 'search_products'):
-                products = await scraper.search_products(product_name, standalone_only=standalone_only)
-            # 對於原價屋，支援過濾專案商品
-            elif scraper_class.__name__ == 'CoolPCScraper' and hasattr(scraper, 'search_products'):
-                products = await scraper.search_products(product_name, standalone_only=standalone_only)
+            # 不在爬取時排除組合商品，單獨商品篩選於讀取時依 is_bundle 套用
+            if category is not None:
+                products = await scraper.search_products(product_name, category=category)
             else:
                 products = await scraper.search_products(product_name)
                 
             print(f"{scraper_class.__name__} 搜尋完成，找到 {len(products)} 個產品")
-            return products
+        
+        if scraper.is_store_unreachable():
+            breaker.record_failure()
+            return None
+        breaker.record_success()
+        return products
+    except asyncio.CancelledError:
+        # 被搜尋時限取消：已確認連線失敗才算失敗，否則只釋放試探名額
+        if scraper is not None and scraper.is_store_unreachable():
+            breaker.record_failure()
+        else:
+            breaker.release_probe()
+        raise
     except Exception as e:
+        breaker.record_failure()
         print(f"搜尋 {scraper_class.__name__} 時發生錯誤: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return None
 
-async def scrape_all_stores(product_name: str, standalone_only: bool = False) -> Dict[str, Any]:
-    """並行搜尋所有商店"""
-    # 建立搜尋任務
-    tasks = []
-    store_names = []
+async def scrape_all_stores(product_name: str, deadline_ms: Optional[int] = None, store_keys: Optional[List[str]] = None, priority: int = PRIORITY_INTERACTIVE, categories: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """並行搜尋指定商店（預設全部），超過時限的商店會被取消並回傳部分結果；categories 內的商店只搜尋指定分類"""
+    categories = categories or {}
+    budget_seconds = (deadline_ms or config.SEARCH_DEADLINE_MS) / 1000
+    deadline = time.monotonic() + budget_seconds
+    
+    # 建立搜尋任務（斷路器開啟的商店直接視為失敗）
+    tasks = {}
+    circuit_open_stores = []
+    for store_key in (store_keys if store_keys is not None else SCRAPERS.keys()):
+        scraper_class = SCRAPERS[store_key]
+        if not circuit_breakers[store_key].allow_request():
+            circuit_open_stores.append(store_key)
+            continue
+        task = asyncio.create_task(scrape_single_store(store_key, scraper_class, product_name, deadline, priority, categories.get(store_key)))
+        tasks[task] = store_key
+    
+    if circuit_open_stores:
+        print(f"斷路器開啟，略過商店: {', '.join(circuit_open_stores)}")
     
-    for store_key, scraper_class in SCRAPERS.items():
-        task = scrape_single_store(scraper_class, product_name, standalone_only)
-        tasks.append(task)
-        store_names.append(store_key)
+    # 並行執行，時限到時取消尚未完成的商店
+    done, pending = set(), set()
+    if tasks:
+        done, pending = await asyncio.wait(tasks.keys(), timeout=budget_seconds)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
     
-    # 並行執行
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    timed_out_stores = [tasks[task] for task in pending]
+    if timed_out_stores:
+        print(f"搜尋時限 {budget_seconds:.1f} 秒已到，取消商店: {', '.join(timed_out_stores)}")
     
     # 整理結果
     all_products = []
+    store_products = {}
     successful_stores = []
-    failed_stores = []
+    empty_stores = []
+    failed_stores = list(circuit_open_stores)
     
-    for i, result in enumerate(results):
-        store_name = store_names[i]
+    for task, store_name in tasks.items():
+        if task not in done:
+            continue
         
+        result = task.exception() or task.result()
         if isinstance(result, Exception):
             print(f"Store {store_name} failed: {result}")
             failed_stores.append(store_name)
         elif isinstance(result, list):
             all_products.extend(result)
+            store_products[store_name] = result
             if result:  # 如果有找到產品
                 successful_stores.append(store_name)
             else:
+                empty_stores.append(store_name)
                 failed_stores.append(store_name)
         else:
             failed_stores.append(store_name)
     
     return {
         "products": all_products,
+        "store_products": store_products,
         "successful_stores": successful_stores,
-        "failed_stores": failed_stores
+        "empty_stores": empty_stores,
+        "failed_stores": failed_stores,
+        "timed_out_stores": timed_out_stores
     }
 
+async def scrape_and_cache_stores(product_name: str, store_keys: List[str], deadline_ms: Optional[int] = None, priority: int = PRIORITY_INTERACTIVE, categories: Optional[Dict[str, str]] = None):
+    """爬取指定商店，相關性過濾後依商店寫入快取，回傳 (爬取結果, 各商店的欄位式索引)"""
+    # 相同查詢（標準形式）同時只爬取一次，其餘請求共用結果
+    scrape_results = await search_flight.do(
+        search_key(product_name, store_keys, categories),
+        lambda: scrape_all_stores(product_name, deadline_ms, store_keys, priority, categories)
+    )
+    
+    fresh_entries = {}
+    for store_key, store_products in scrape_results["store_products"].items():
+        # 產品相關性過濾 - 使用較低的閾值以包含整機配置等複雜產品名稱
+        relevant_products = product_matcher.filter_relevant_products(
+            product_name,
+            [p.model_dump() for p in store_products],
+            threshold=0.2
+        )
+        fresh_entries[store_key] = encode_products(relevant_products)
+    
+    # 有結果的商店寫入快取；正常完成但沒有結果的商店記入短時間的負向快取，連線失敗或錯誤的商店不記錄，下次請求再重試
+    await cache_manager.run(
+        cache_manager.store_results,
+        product_name,
+        {store_key: fresh_entries[store_key] for store_key, store_products in scrape_results["store_products"].items() if store_products},
+        scrape_results["empty_stores"],
+        categories
+    )
+    
+    return scrape_results, fresh_entries
+
+async def revalidate_in_background(product_name: str, store_keys: List[str], categories: Optional[Dict[str, str]] = None) -> Optional[asyncio.Task]:
+    """以背景優先權更新過期的商店快取，相同查詢同時只執行一次（跨 worker 以租約協調）"""
+    task_key = search_key(product_name, store_keys, categories)
+    if task_key in revalidation_tasks:
+        return revalidation_tasks[task_key]
+    if not await cache_manager.run(cache_manager.acquire_lease, f"revalidate|{task_key}", config.SEARCH_DEADLINE_MS / 1000):
+        return None
+    if task_key in revalidation_tasks:
+        # 等待租約期間已由其他請求建立
+        return revalidation_tasks[task_key]
+    
+    async def revalidate():
+        try:
+            await scrape_and_cache_stores(product_name, store_keys, priority=PRIORITY_BACKGROUND, categories=categories)
+            print(f"背景更新完成: {task_key}")
+        except Exception as e:
+            print(f"背景更新 {task_key} 時發生錯誤: {e}")
+    
+    task = asyncio.create_task(revalidate())
+    revalidation_tasks[task_key] = task
+    task.add_done_callback(lambda _: revalidation_tasks.pop(task_key, None))
+    return task
+
+async def stores_due_for_refresh(product_name: str, lead_seconds: float) -> List[str]:
+    """找出快取不存在或即將到期的商店（最近確認沒有結果的商店除外）"""
+    entries, empty_stores = await cache_manager.run(cache_manager.lookup_stores, list(SCRAPERS), product_name)
+    refresh_before = time.time() + lead_seconds
+    return [
+        store_key for store_key in SCRAPERS
+        if (store_key not in entries and store_key not in empty_stores)
+        or (store_key in entries and entries[store_key]["expires_at"] <= refresh_before)
+    ]
+
+async def cache_warmer():
+    """背景預熱：定期在熱門查詢的快取到期前，以背景優先權重新爬取"""
+    while True:
+        await asyncio.sleep(config.CACHE_WARM_INTERVAL_SECONDS)
+        try:
+            refreshed = 0
+            for _, query, _ in popularity_tracker.top(config.CACHE_WARM_TOP_N, config.CACHE_WARM_MIN_COUNT):
+                due_stores = await stores_due_for_refresh(query, config.CACHE_WARM_LEAD_SECONDS)
+                if not due_stores:
+                    continue
+                # 逐一等待，避免預熱時同時對商店送出大量請求
+                task = await revalidate_in_background(query, due_stores)
+                if task is not None:
+                    await asyncio.shield(task)
+                    refreshed += 1
+            warmer_stats["runs"] += 1
+            warmer_stats["refreshed_queries"] += refreshed
+            warmer_stats["last_run"] = datetime.now().isoformat()
+            if refreshed:
+                print(f"背景預熱完成：更新 {refreshed} 個熱門查詢")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"背景預熱時發生錯誤: {e}")
+
+async def coolpc_catalog_refresher():
+    """定時以背景優先權更新原價屋價格表快照（啟動時先建立一次）"""
+    while True:
+        try:
+            async with create_scraper(CoolPCScraper, priority=PRIORITY_BACKGROUND) as scraper:
+                await coolpc_catalog.refresh(scraper)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"更新原價屋價格表快照時發生錯誤: {e}")
+        await asyncio.sleep(config.COOLPC_CATALOG_REFRESH_MINUTES * 60)
+
 @app.get("/api/search", response_model=SearchResponse)
 async def search_products(
     product: str = Query(..., description="要搜尋的產品名稱", min_length=2),
@@ -163,86 +402,86 @@ async def search_products(
     in_stock_only: bool = Query(False, description="只顯示有庫存的商品"),
     standalone_only: bool = Query(False, description="只顯示單獨商品（排除整機/筆電）"),
     min_price: float = Query(None, description="最低價格篩選"),
-    max_price: float = Query(None, description="最高價格篩選")
+    max_price: float = Query(None, description="最高價格篩選"),
+    deadline_ms: Optional[int] = Query(None, description="搜尋時限（毫秒），逾時的商店不等待", ge=100, le=120000),
+    category: Optional[str] = Query(None, description=f"商品分類篩選 ({', '.join(CATEGORY_PATTERNS)})")
 ):
     """搜尋產品價格"""
+    if category is not None and category not in CATEGORY_PATTERNS:
+        return SearchResponse(
+            success=False,
+            message="不支援的商品分類",
+            error=f"category 必須是 {', '.join(CATEGORY_PATTERNS)} 之一"
+        )
+    
     try:
-        # 檢查快取
-        cached_result = cache_manager.get(product)
-        if cached_result:
-            search_result = SearchResult(**cached_result)
-            
-            # 應用篩選和排序
-            filtered_products = apply_filters_and_sort(
-                search_result.results, 
-                sort_by, order, in_stock_only, min_price, max_price
-            )
-            
-            search_result.results = filtered_products
-            search_result.total_found = len(filtered_products)
-            
-            return SearchResponse(
-                success=True,
-                message="從快取返回結果",
-                data=search_result
-            )
+        popularity_tracker.record(product_matcher.canonicalize_query(product), product)
+        
+        # 檢查各商店快取（內容為未篩選的相關產品，篩選與排序於每次讀取時套用）
+        # 沒有快取結果、但最近確認過沒有產品的商店不再查詢
+        # 指定分類時，可依分類搜尋的商店（原價屋）只搜尋該分類，快取也依分類區分
+        categories = store_categories(category)
+        cached_entries, empty_stores = await cache_manager.run(cache_manager.lookup_stores, list(SCRAPERS), product, categories)
+        missing_stores = [store_key for store_key in SCRAPERS if store_key not in cached_entries and store_key not in empty_stores]
+        stale_stores = [store_key for store_key, entry in cached_entries.items() if cache_manager.is_stale(entry)]
+        
+        # 過期但未超過可接受時間的商店先回傳舊資料，於背景更新
+        if stale_stores:
+            await revalidate_in_background(product, stale_stores, categories)
+        
+        # 缺少或超過可接受過期時間的商店同步重新爬取
+        scrape_results = None
+        fresh_entries = {}
+        if missing_stores:
+            scrape_results, fresh_entries = await scrape_and_cache_stores(product, missing_stores, deadline_ms, categories=categories)
+            print(f"查詢 '{product_matcher.canonicalize_query(product)}': 快取命中 {len(cached_entries)} 個商店，已知無結果 {len(empty_stores)} 個商店，重新爬取 {len(missing_stores)} 個商店")
         
-        # 執行搜尋
-        scrape_results = await scrape_all_stores(product, standalone_only)
-        all_products = scrape_results["products"]
+        # 合併快取中仍有效的商店與新爬取的商店（欄位式索引，不建立 Product 物件）
+        result_index = ResultIndex(list(cached_entries.values()) + list(fresh_entries.values()))
         
-        if not all_products:
+        if not len(result_index):
             return SearchResponse(
                 success=False,
                 message="未找到相關產品",
                 error="所有商店都沒有找到匹配的產品"
             )
         
-        # 產品相關性過濾 - 使用較低的閾值以包含更多相關產品
-        relevant_products = product_matcher.filter_relevant_products(
-            product, 
-            [p.model_dump() for p in all_products],
-            threshold=0.2,  # 降低閾值以包含整機配置等複雜產品名稱
-            standalone_only=standalone_only  # 是否只顯示單獨商品
-        )
-        
-        # 轉換回Product物件
-        filtered_products_objects = []
-        for product_dict in relevant_products:
-            try:
-                product_obj = Product(**product_dict)
-                filtered_products_objects.append(product_obj)
-            except Exception as e:
-                print(f"Error creating product object: {e}")
-                continue
-        
         # 應用篩選和排序
-        final_products = apply_filters_and_sort(
-            filtered_products_objects,
-            sort_by, order, in_stock_only, min_price, max_price
-        )
+        rows = result_index.select(sort_by, order, in_stock_only, standalone_only, min_price, max_price, category)
         
-        # 建立搜尋結果
-        current_time = datetime.now()
-        cache_expires = current_time + timedelta(minutes=config.CACHE_EXPIRE_MINUTES)
+        # 時間取最舊的資料，到期取最早到期的商店
+        current_time = time.time()
+        scraped_times = [entry["scraped_at"] for entry in cached_entries.values()]
+        expire_times = [entry["expires_at"] for entry in cached_entries.values()]
+        if fresh_entries:
+            scraped_times.append(current_time)
+            expire_times.extend(
+                current_time + cache_manager.get_store_ttl_minutes(store_key) * 60
+                for store_key in fresh_entries
+            )
         
-        search_result = SearchResult(
-            product=product,
-            timestamp=current_time,
-            results=final_products,
-            cache_expires=cache_expires,
-            total_found=len(final_products),
-            successful_stores=scrape_results["successful_stores"],
-            failed_stores=scrape_results["failed_stores"]
-        )
+        successful_stores = [store_key for store_key, entry in cached_entries.items() if entry["rows"]]
+        failed_stores, timed_out_stores = list(empty_stores), []
+        if scrape_results is not None:
+            successful_stores += scrape_results["successful_stores"]
+            failed_stores += scrape_results["failed_stores"]
+            timed_out_stores = scrape_results["timed_out_stores"]
         
-        # 儲存到快取
-        cache_manager.set(product, search_result.dict())
+        message = "從快取返回結果"
+        if scrape_results is not None:
+            message = f"找到 {len(rows)} 個相關產品"
+            if cached_entries:
+                message += f"（{len(cached_entries)} 個商店來自快取）"
+            if timed_out_stores:
+                message += f"（{len(timed_out_stores)} 個商店逾時）"
+        if stale_stores:
+            message += f"（{len(stale_stores)} 個商店為過期資料，背景更新中）"
         
-        return SearchResponse(
-            success=True,
-            message=f"找到 {len(final_products)} 個相關產品",
-            data=search_result
+        return encode_search_response(
+            product, message, rows,
+            datetime.fromtimestamp(min(scraped_times)),
+            datetime.fromtimestamp(min(expire_times)),
+            successful_stores, failed_stores, timed_out_stores
         )
         
     except Exception as e:
@@ -253,39 +492,35 @@ async def search_products(
             error=str(e)
         )
 
-def apply_filters_and_sort(
-    products: List[Product],
-    sort_by: str,
-    order: str,
-    in_stock_only: bool,
-    min_price: float = None,
-    max_price: float = None
-) -> List[Product]:
-    """應用篩選和排序"""
-    filtered = products.copy()
-    
-    # 庫存篩選
-    if in_stock_only:
-        filtered = [p for p in filtered if p.in_stock]
-    
-    # 價格篩選
-    if min_price is not None:
-        filtered = [p for p in filtered if p.price >= min_price]
-    
-    if max_price is not None:
-        filtered = [p for p in filtered if p.price <= max_price]
-    
-    # 排序
-    reverse = (order.lower() == "desc")
-    
-    if sort_by == "price":
-        filtered.sort(key=lambda x: x.price, reverse=reverse)
-    elif sort_by == "name":
-        filtered.sort(key=lambda x: x.product_name.lower(), reverse=reverse)
-    elif sort_by == "store":
-        filtered.sort(key=lambda x: x.store, reverse=reverse)
-    
-    return filtered
+def encode_search_response(
+    product: str,
+    message: str,
+    rows: List[str],
+    timestamp: datetime,
+    cache_expires: datetime,
+    successful_stores: List[str],
+    failed_stores: List[str],
+    timed_out_stores: List[str]
+) -> Response:
+    """以預先序列化的產品JSON列直接組成 SearchResponse 格式的回應，略過 pydantic 驗證"""
+    data = {
+        "product": product,
+        "timestamp": timestamp.isoformat(),
+        "cache_expires": cache_expires.isoformat(),
+        "total_found": len(rows),
+        "successful_stores": successful_stores,
+        "failed_stores": failed_stores,
+        "timed_out_stores": timed_out_stores
+    }
+    # 欄位順序與 SearchResult 相同，results 在 timestamp 之後
+    head = json.dumps({"product": data["product"], "timestamp": data["timestamp"]}, ensure_ascii=False)[:-1]
+    tail = json.dumps({key: data[key] for key in list(data)[2:]}, ensure_ascii=False)[1:]
+    body = (
+        '{"success":true,"message":' + json.dumps(message, ensure_ascii=False)
+        + ',"data":' + head + ',"results":[' + ','.join(rows) + '],' + tail
+        + ',"error":null}'
+    )
+    return Response(content=body.encode("utf-8"), media_type="application/json")
 
 # 個別爬蟲端點
 
@@ -303,7 +538,7 @@ def apply_filters_and_sort(
 async def search_pchome(product: str = Query(..., description="要搜尋的產品名稱")):
     """搜尋PChome 24h購物"""
     try:
-        async with PChomeScraper() as scraper:
+        async with create_scraper(PChomeScraper) as scraper:
             products = await scraper.search_products(product)
             return {"store": "PChome 24h", "products": [p.dict() for p in products]}
     except Exception as e:
@@ -13,6 +13,8 @@ class Product(BaseModel):
     image_url: Optional[str] = None
     specifications: Optional[str] = None
     is_bundle: bool = False  # 是否為組合商品/專案商品
+    similarity_score: Optional[float] = None  # 與搜尋詞的相關性分數
+    category: Optional[str] = None  # 商品分類（cpu、vga 等，無法對應時為 other），商店未提供時為None
 
 class SearchResult(BaseModel):
     """搜尋結果模型"""
@@ -23,6 +25,7 @@ class SearchResult(BaseModel):
     total_found: int
     successful_stores: List[str]
     failed_stores: List[str]
+    timed_out_stores: List[str] = []  # 超過搜尋時限而被取消的商店
 
 class SearchResponse(BaseModel):
     """API 回應模型"""
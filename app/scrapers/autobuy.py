@@ -1,5 +1,4 @@
 import asyncio
-import aiohttp
 import urllib.parse
 import re
 import json
@@ -11,8 +10,8 @@ from app.models.product import Product
 class AutobuyScraper(BaseScraper):
     """AUTOBUY購物中心爬蟲"""
     
-    def __init__(self):
-        super().__init__("AUTOBUY購物中心")
+    def __init__(self, **kwargs):
+        super().__init__("AUTOBUY購物中心", **kwargs)
         self.base_url = "https://www.autobuy.tw"
         self.search_url = f"{self.base_url}/search"
     
@@ -158,43 +157,39 @@ class AutobuyScraper(BaseScraper):
                 'Referer': 'https://www.autobuy.tw/'
             }
             
-            timeout = aiohttp.ClientTimeout(total=30)
+            content = await self._fetch_page(search_url, headers=headers)
+            if not content:
+                print("AutoBuy: 無法獲取網頁內容")
+                return []
+            
+            soup = BeautifulSoup(content, 'html.parser')
+            
+            print(f"AutoBuy: 頁面長度 {len(content)} 字符")
+            
+            # 解析產品列表
+            product_data_list = self._parse_product_list(soup)
+            
+            # 過濾組合商品（如果需要）
+            if standalone_only:
+                filtered_count = 0
+                original_count = len(product_data_list)
+                product_data_list = [p for p in product_data_list if not p.get('is_bundle', False)]
+                filtered_count = original_count - len(product_data_list)
+                if filtered_count > 0:
+                    print(f"AutoBuy: 過濾了 {filtered_count} 個組合商品")
+            
+            # 轉換為Product物件
+            products = []
+            for data in product_data_list:
+                try:
+                    product = Product(**data)
+                    products.append(product)
+                except Exception as e:
+                    print(f"AutoBuy: 創建Product物件時出錯: {e}, 數據: {data}")
+                    continue
+            
+            return products
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(search_url, headers=headers) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        soup = BeautifulSoup(content, 'html.parser')
-                        
-                        print(f"AutoBuy: 頁面長度 {len(content)} 字符")
-                        
-                        # 解析產品列表
-                        product_data_list = self._parse_product_list(soup)
-                        
-                        # 過濾組合商品（如果需要）
-                        if standalone_only:
-                            filtered_count = 0
-                            original_count = len(product_data_list)
-                            product_data_list = [p for p in product_data_list if not p.get('is_bundle', False)]
-                            filtered_count = original_count - len(product_data_list)
-                            if filtered_count > 0:
-                                print(f"AutoBuy: 過濾了 {filtered_count} 個組合商品")
-                        
-                        # 轉換為Product物件
-                        products = []
-                        for data in product_data_list:
-                            try:
-                                product = Product(**data)
-                                products.append(product)
-                            except Exception as e:
-                                print(f"AutoBuy: 創建Product物件時出錯: {e}, 數據: {data}")
-                                continue
-                        
-                        return products
-                    else:
-                        print(f"AutoBuy: HTTP錯誤 {response.status}")
-                        return []
-                        
         except Exception as e:
             print(f"AutoBuy: 搜尋產品時出錯: {e}")
             import traceback
@@ -1,20 +1,47 @@
 import aiohttp
-import asyncio
-import random
 import re
+import time
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 from bs4 import BeautifulSoup
 from app.config import Config
 from app.models.product import Product
 from app.utils.price_formatter import PriceFormatter
+from app.utils.http_pool import HttpSessionPool
+from app.utils.http_cache import ValidatorCache, ResponseCache, make_cache_key
+from app.utils.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE
+from app.utils.charset import charset_decoder
+from app.utils.single_flight import SingleFlight
 
 class BaseScraper(ABC):
     """基礎爬蟲抽象類別"""
     
-    def __init__(self, store_name: str):
+    # search_products 是否接受 category 參數（只搜尋指定分類，結果隨分類不同）
+    supports_category = False
+    
+    def __init__(
+        self,
+        store_name: str,
+        session_pool: Optional[HttpSessionPool] = None,
+        validator_cache: Optional[ValidatorCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        deadline: Optional[float] = None,
+        page_flight: Optional[SingleFlight] = None
+    ):
         self.store_name = store_name
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.session_pool = session_pool
+        self.validator_cache = validator_cache
+        self.response_cache = response_cache
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.priority = priority
+        self.deadline = deadline  # time.monotonic() 基準的搜尋截止時間
+        self.page_flight = page_flight  # 合併同時間對相同URL的請求
+        # 請求結果計數，供斷路器判斷商店是否可用
+        self.fetch_successes = 0
+        self.fetch_failures = 0
+        self._owns_session_pool = False
         self.config = Config()
         self.price_formatter = PriceFormatter()
     
@@ -28,72 +55,120 @@ class BaseScraper(ABC):
         await self._close_session()
     
     async def _create_session(self):
-        """建立HTTP會話"""
-        headers = {
-            'User-Agent': random.choice(self.config.USER_AGENTS),
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'zh-TW,zh;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        
-        timeout = aiohttp.ClientTimeout(total=self.config.TIMEOUT_SECONDS)
-        # 建立SSL和DNS容錯的連接器
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            ssl=False,  # 暫時禁用SSL驗證以避免連接問題
-            ttl_dns_cache=300,  # DNS快取5分鐘
-            use_dns_cache=True,
-        )
-        self.session = aiohttp.ClientSession(
-            headers=headers,
-            timeout=timeout,
-            connector=connector
-        )
+        """準備HTTP連線池（未注入共用連線池時才自行建立）"""
+        if self.session_pool is None:
+            self.session_pool = HttpSessionPool()
+            self._owns_session_pool = True
     
     async def _close_session(self):
-        """關閉HTTP會話"""
-        if self.session:
-            await self.session.close()
+        """關閉HTTP會話（共用連線池由擁有者負責關閉）"""
+        if self._owns_session_pool and self.session_pool:
+            await self.session_pool.close()
+            self.session_pool = None
+            self._owns_session_pool = False
     
-    async def _fetch_page(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
-        """獲取網頁內容"""
-        if not self.session:
+    async def _get_session(self, url: str) -> aiohttp.ClientSession:
+        """取得URL所屬主機的HTTP會話"""
+        if self.session_pool is None:
             await self._create_session()
+        return await self.session_pool.get_session(url)
+    
+    async def _fetch_page(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """獲取網頁內容"""
+        cache_key = make_cache_key(url, params)
+        
+        # 磁碟回應快取仍在有效期內時不發出請求
+        if self.response_cache is not None:
+            content = await self.response_cache.get(cache_key, url)
+            if content is not None:
+                self.fetch_successes += 1
+                return content
+        
+        session = await self._get_session(url)
+        
+        # 條件式請求：帶上先前記錄的 ETag / Last-Modified
+        request_headers = headers
+        if self.validator_cache is not None:
+            conditional_headers = self.validator_cache.conditional_headers(cache_key)
+            if conditional_headers:
+                request_headers = {**(headers or {}), **conditional_headers}
         
         for attempt in range(self.config.MAX_RETRIES):
+            timeout = self._request_timeout()
+            if timeout is None:
+                print(f"Deadline exceeded before fetching {url}")
+                return None
+            
             try:
-                # 隨機延遲以避免被封鎖
-                if attempt > 0:
-                    delay = random.uniform(1, self.config.REQUEST_DELAY * 2)
-                    await asyncio.sleep(delay)
-                
-                async with self.session.get(url, params=params) as response:
-                    if response.status == 200:
-                        # 嘗試多種編碼方式來處理中文網站
-                        try:
-                            content = await response.text(encoding='utf-8')
-                        except UnicodeDecodeError:
-                            try:
-                                content = await response.text(encoding='big5')
-                            except UnicodeDecodeError:
-                                try:
-                                    content = await response.text(encoding='gb2312')
-                                except UnicodeDecodeError:
-                                    # 如果都失敗，使用錯誤處理模式
-                                    content = await response.text(encoding='utf-8', errors='ignore')
+                # 由主機限速器控制請求節奏（含重試），取代固定延遲
+                async with self.rate_limiter.limit(url, self.priority) as host_limiter, \
+                        session.get(url, params=params, headers=request_headers, timeout=timeout) as response:
+                    if response.status == 304 and self.validator_cache is not None:
+                        # 內容未變更，直接使用先前儲存的頁面
+                        content = self.validator_cache.get_body(cache_key)
+                        if content is not None:
+                            self.fetch_successes += 1
+                            await self._store_response(cache_key, url, content)
+                            return content
+                        # 已儲存的內容被淘汰，下一次改為完整請求
+                        print(f"HTTP 304 without cached body for {url}")
+                        request_headers = headers
+                    elif response.status == 200:
+                        # 只讀取一次原始位元組，依標頭 / <meta> / 主機記錄決定編碼後單次解碼
+                        body = await response.read()
+                        content, _ = charset_decoder.decode(body, response.url.host or '', response.charset)
+                        if self.validator_cache is not None:
+                            self.validator_cache.store(cache_key, response.headers, content)
+                        self.fetch_successes += 1
+                        await self._store_response(cache_key, url, content)
                         return content
                     else:
                         print(f"HTTP {response.status} for {url}")
+                        self.fetch_failures += 1
+                        if response.status in (429, 503):
+                            host_limiter.pause(self._retry_after_seconds(response))
                         
             except Exception as e:
                 print(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
+                self.fetch_failures += 1
                 if attempt == self.config.MAX_RETRIES - 1:
                     return None
         
         return None
     
+    async def _fetch_shared_page(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """獲取可跨搜尋共用的頁面（如商品詳細頁），相同URL同時只發送一次請求"""
+        if self.page_flight is None:
+            return await self._fetch_page(url, headers=headers)
+        return await self.page_flight.do(make_cache_key(url), lambda: self._fetch_page(url, headers=headers))
+    
+    def is_store_unreachable(self) -> bool:
+        """本次搜尋中所有請求都失敗時視為商店無法連線"""
+        return self.fetch_failures > 0 and self.fetch_successes == 0
+    
+    def _request_timeout(self) -> Optional[aiohttp.ClientTimeout]:
+        """依搜尋截止時間計算單次請求的逾時，已超過截止時間時回傳None"""
+        total = float(self.config.TIMEOUT_SECONDS)
+        if self.deadline is not None:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            total = min(total, remaining)
+        return aiohttp.ClientTimeout(total=total)
+    
+    def _retry_after_seconds(self, response: aiohttp.ClientResponse) -> float:
+        """解析 Retry-After 標頭（秒），無法解析時使用預設暫停時間"""
+        retry_after = response.headers.get('Retry-After', '')
+        try:
+            return min(float(retry_after), 60.0)
+        except ValueError:
+            return float(self.config.REQUEST_DELAY)
+    
+    async def _store_response(self, cache_key: str, url: str, content: str):
+        """將成功取得的頁面寫入磁碟回應快取"""
+        if self.response_cache is not None:
+            await self.response_cache.set(cache_key, url, content)
+    
     def _parse_html(self, html_content: str) -> BeautifulSoup:
         """解析HTML內容"""
         return BeautifulSoup(html_content, 'html.parser')
@@ -7,20 +7,216 @@ import logging
 import re
 import asyncio
 import json
+import time
+from collections import deque
+from datetime import datetime
 from urllib.parse import urljoin, quote, parse_qs, urlparse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from bs4 import BeautifulSoup
+import numpy as np
 
 from .base_scraper import BaseScraper
 from ..models.product import Product
+from ..config import Config
+from ..utils.catalog_index import CatalogIndex
+from ..utils.product_matcher import OTHER_CATEGORY
+from ..utils.price_vector import PriceVector, price_events
+from ..utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# 價格表的單次掃描記號：表格欄位、分類 <SELECT>、<OPTGROUP>、<OPTION> 以及 c*/g* JavaScript 數組
+CATALOG_TOKEN_PATTERN = re.compile(
+    r"<td[^>]*>(?P<td_text>[^<]*)</td>(?P<td>)"
+    r"|<select\b[^>]*?\bname=[\"']?n?(?P<select_id>\d+)[^>]*>(?P<select>)"
+    r"|</select>(?P<select_end>)"
+    r"|<optgroup\b[^>]*?\blabel=[\"']?(?P<optgroup_label>[^\"'>]*)[^>]*>(?P<optgroup>)"
+    r"|<option\b[^>]*?\bvalue=[\"']?(?P<option_value>\d+)[^>]*>(?P<option_text>[^<]*)(?P<option>)"
+    r"|\b(?P<array_name>[cg])(?P<array_id>\d+)=\[(?P<array_data>[\d.,]*)\](?P<array>)",
+    re.IGNORECASE
+)
+PRICE_PATTERN = re.compile(r'\$(\d+)')
+
+# 商品名稱清理（整份價格表上萬個選項共用，預先編譯）
+UNREADABLE_PATTERN = re.compile(r'[^\w\s\-\(\)\[\]/\+\.\u4e00-\u9fff]+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+BUNDLE_TAG_PATTERN = re.compile(r'\[\s*(?:A\s*-)?專案\s*\]')
+
+# 基本的字詞替換，修復一些可能的解析問題
+NAME_FIXES = {
+    '_': '藍寶石',
+    'fB760': '[需搭配B760]',
+    'fB850': '[需搭配B850]', 
+    'fB860': '[需搭配B860]',
+    'fZ790': '[需搭配Z790]',
+    'fZ890': '[需搭配Z890]',
+    'fX370': '[需搭配X370]',
+    'fX3D': '[需搭配X3D]',
+    'CDO': '主板',
+    'dM': '專案',
+    'AM': '專案',
+    'GRE': 'GRE',
+    'XT': 'XT',
+    'ݷf': '[需搭配]',
+    'ݥf': '[需搭配]',
+    'Xʡ': 'CPU合購',
+    'ݭI': '金屬背板',
+    'U O': '三年保固',
+    'T O': '三年保固',
+    'T OT': '三年保固',
+    'ʤ': '限購一片',
+    'MITxWs': 'MIT台灣製',
+    'a ': '極地 ',
+    't ': '暗黑 '
+}
+
+# 價格表分類名稱對應的商品分類（依序比對，散熱器需在處理器之前，例如 "CPU散熱器"）
+SECTION_CATEGORIES = (
+    ('cooler', re.compile(r'散熱|水冷')),
+    ('cpu', re.compile(r'處理器|CPU', re.IGNORECASE)),
+    ('motherboard', re.compile(r'主機板|\bMB\b', re.IGNORECASE)),
+    ('ram', re.compile(r'記憶體|\bRAM\b', re.IGNORECASE)),
+    ('ssd', re.compile(r'固態|SSD', re.IGNORECASE)),
+    ('hdd', re.compile(r'硬碟|HDD', re.IGNORECASE)),
+    ('vga', re.compile(r'顯示卡|VGA', re.IGNORECASE)),
+    ('monitor', re.compile(r'螢幕|顯示器')),
+    ('psu', re.compile(r'電源供應器|POWER', re.IGNORECASE)),
+    ('case', re.compile(r'機殼|CASE', re.IGNORECASE)),
+)
+
+# 專案或需搭配商品的關鍵字（已轉小寫）
+BUNDLE_KEYWORDS = tuple(keyword.lower() for keyword in (
+    '專案', '需搭配', 'CPU合購', '[需搭配', '[專案',
+    '搭配主板', '搭配CPU', '限定搭配', '合購優惠',
+    'f主板', 'fCPU', 'f搭配'
+))
+
+class CoolPCCatalog:
+    """原價屋價格表快照（整個行程共用）：定時下載並解析一次，查詢直接使用記憶體中的倒排索引"""
+    
+    def __init__(self):
+        self.index: Optional[CatalogIndex] = None
+        self.js_arrays = 0
+        self.prices: Optional[PriceVector] = None
+        self.fetched_at = 0.0
+        self.refreshes = 0
+        self.searches = 0
+        self.failures = 0
+        self.failed_at: Optional[float] = None
+        # 快照之間的價格變動事件（最新的在後面）
+        self.events: deque = deque(maxlen=Config.COOLPC_PRICE_EVENT_LIMIT)
+        self.last_diff: Dict[str, int] = {}
+        # 同一時間只下載一次；鎖只保護與前一份快照比對及替換的步驟
+        self._flight = SingleFlight()
+        self._lock = asyncio.Lock()
+    
+    def age_seconds(self) -> float:
+        """快照的經過時間（秒），尚未建立時為無限大"""
+        if self.index is None:
+            return float('inf')
+        return time.monotonic() - self.fetched_at
+    
+    def retry_wait_seconds(self) -> float:
+        """上次更新失敗後還需等待多久才能重試（秒）"""
+        if self.failed_at is None:
+            return 0.0
+        return max(0.0, Config.COOLPC_CATALOG_RETRY_SECONDS - (time.monotonic() - self.failed_at))
+    
+    async def refresh(self, scraper: 'CoolPCScraper') -> Optional[CatalogIndex]:
+        """重新下載價格表並建立索引，失敗時保留舊快照；並行的呼叫共用同一次更新"""
+        return await self._flight.do("refresh", lambda: self._refresh(scraper))
+    
+    async def _refresh(self, scraper: 'CoolPCScraper') -> Optional[CatalogIndex]:
+        """下載價格表並替換快照"""
+        html = await scraper._fetch_page(scraper.evaluate_url)
+        if not html:
+            logger.warning("原價屋無法獲取價格表，保留舊快照")
+            return self._record_failure()
+        
+        # 解析與建立索引需要數百毫秒，在執行緒中進行以免阻塞事件迴圈
+        started_at = time.perf_counter()
+        records, js_arrays, prices, index = await asyncio.to_thread(self._build_snapshot, scraper, html)
+        if not records:
+            logger.warning("原價屋價格表沒有可解析的商品，保留舊快照")
+            return self._record_failure()
+        
+        async with self._lock:
+            if self.prices is not None:
+                self._record_price_events(prices, records)
+            self.index = index
+            self.js_arrays = js_arrays
+            self.prices = prices
+            self.fetched_at = time.monotonic()
+            self.failed_at = None
+            self.refreshes += 1
+        logger.info(f"原價屋價格表快照: {len(records)} 個商品，解析與建立索引 {(time.perf_counter() - started_at) * 1000:.0f} ms")
+        return self.index
+    
+    def _build_snapshot(self, scraper: 'CoolPCScraper', html: str) -> Tuple[List[Dict[str, Any]], int, Optional[PriceVector], Optional[CatalogIndex]]:
+        """解析價格表並建立價格向量與索引（不修改共用狀態，可在執行緒中執行）"""
+        records, arrays = scraper._tokenize_catalog(html)
+        if not records:
+            return records, len(arrays), None, None
+        return records, len(arrays), PriceVector.from_records(records), CatalogIndex(records, partition_field='category_key')
+    
+    def _record_failure(self) -> Optional[CatalogIndex]:
+        """記錄更新失敗的時間，COOLPC_CATALOG_RETRY_SECONDS 內不再重新下載"""
+        self.failures += 1
+        self.failed_at = time.monotonic()
+        return self.index
+    
+    def _record_price_events(self, prices: PriceVector, records: List[Dict[str, Any]]):
+        """與前一份快照的價格向量比對，記錄價格變動、新增與移除的商品"""
+        diff = prices.diff(self.prices)
+        events = price_events(diff, prices, self.prices, records, self.index.records)
+        at = datetime.now().isoformat()
+        for event in events:
+            event["at"] = at
+        self.events.extend(events)
+        self.last_diff = {
+            "changed": len(diff["changed"]),
+            "added": len(diff["added"]),
+            "removed": len(diff["removed"])
+        }
+        if events:
+            logger.info(f"原價屋價格變動: {self.last_diff}")
+    
+    def get_events(self, limit: int = 100, event: Optional[str] = None) -> List[Dict[str, Any]]:
+        """取得最近的價格變動事件（最新的在前），可依事件類型篩選"""
+        events = [item for item in reversed(self.events) if event is None or item["event"] == event]
+        return events[:limit]
+    
+    async def ensure(self, scraper: 'CoolPCScraper', max_age_seconds: float) -> Optional[CatalogIndex]:
+        """取得未超過 max_age_seconds 的快照，過舊或不存在時由一個請求負責更新（剛失敗過時沿用舊快照）"""
+        if self.age_seconds() <= max_age_seconds or self.retry_wait_seconds() > 0:
+            return self.index
+        return await self.refresh(scraper)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """取得快照統計資訊"""
+        age = self.age_seconds()
+        return {
+            "age_seconds": None if age == float('inf') else round(age, 1),
+            "refreshes": self.refreshes,
+            "searches": self.searches,
+            "failures": self.failures,
+            "retry_in_seconds": round(self.retry_wait_seconds(), 1),
+            "js_arrays": self.js_arrays,
+            "last_diff": self.last_diff,
+            "price_events": len(self.events),
+            **(self.index.get_stats() if self.index else {})
+        }
+
+# 整個行程共用的原價屋價格表快照
+coolpc_catalog = CoolPCCatalog()
+
 class CoolPCScraper(BaseScraper):
     """原價屋爬蟲"""
     
-    def __init__(self):
-        super().__init__("原價屋")
+    supports_category = True
+    
+    def __init__(self, **kwargs):
+        super().__init__("原價屋", **kwargs)
         self.base_url = "https://www.coolpc.com.tw"
         self.evaluate_url = f"{self.base_url}/evaluate.php"
     
@@ -39,108 +235,42 @@ class CoolPCScraper(BaseScraper):
         """建構搜尋URL"""
         return self.evaluate_url
     
-    def _parse_js_arrays(self, html: str) -> Dict[str, List]:
-        """解析JavaScript中的價格數組"""
-        arrays = {}
-        
-        # 找到所有的c1, c2, g1, g2等數組
-        patterns = [
-            r'c(\d+)=\[([\d,]+)\]',  # 價格數組
-            r'g(\d+)=\[([\d\.,]+)\]',  # 產品規格ID數組
-            r'Header=\[([\d\[\],]+)\]',  # 頭部信息
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, html)
-            for match in matches:
-                if len(match) == 2:
-                    array_name = f"c{match[0]}" if pattern.startswith('c') else f"g{match[0]}" if pattern.startswith('g') else "Header"
-                    array_data = match[1].split(',')
-                    arrays[array_name] = [float(x) if x and x != '0' else 0 for x in array_data]
-        
-        return arrays
-    
-    def _extract_product_names(self, html: str) -> Dict[str, str]:
-        """從HTML中提取產品名稱映射"""
-        products = {}
-        
-        # 直接使用正則表達式解析原始HTML中的OPTION標籤
-        # 匹配 <OPTION value=數字>產品內容</OPTION>
-        option_pattern = r'<OPTION[^>]*value=(\d+)[^>]*>([^<]+)</OPTION>'
-        matches = re.findall(option_pattern, html, re.IGNORECASE | re.DOTALL)
-        
-        for value, text in matches:
-            text = text.strip()
-            # 過濾掉無效的選項，必須包含價格信息
-            if text and '$' in text and len(text) > 10:
-                # 清理多餘空格
-                cleaned_text = re.sub(r'\s+', ' ', text)
-                products[value] = cleaned_text
-                
-        logger.info(f"原價屋提取到 {len(products)} 個有效產品選項")
-        return products
-    
-    def _search_products_in_data(self, query: str, arrays: Dict[str, List], product_names: Dict[str, str]) -> List[Dict[str, Any]]:
-        """在解析的數據中搜尋產品"""
-        results = []
-        query_lower = query.lower()
-        
-        # 搜尋產品名稱
-        for value, product_text in product_names.items():
-            if query_lower in product_text.lower():
-                try:
-                    # 解析產品名稱和價格
-                    # 格式：產品名稱, $價格
-                    if '$' in product_text:
-                        parts = product_text.split('$')
-                        if len(parts) >= 2:
-                            product_name = parts[0].strip().rstrip(',').strip()
-                            price_part = parts[1].split()[0]  # 取第一個部分，去掉後面的空格和其他文字
-                            
-                            # 清理價格字符串
-                            price_str = re.sub(r'[^\d]', '', price_part)
-                            if price_str:
-                                price = float(price_str)
-                                
-                                if price > 0 and product_name:
-                                    product_data = {
-                                        'store': '原價屋',
-                                        'product_name': product_name,
-                                        'price': price,
-                                        'url': f"{self.base_url}/evaluate.php",
-                                        'in_stock': True,
-                                        'image_url': None,
-                                        'option_value': value
-                                    }
-                                    results.append(product_data)
-                
-                except (ValueError, IndexError) as e:
-                    logger.debug(f"解析產品失敗 {value}: {e}")
-                    continue
-        
-        return results
-    
     def _parse_product_list(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         """解析產品列表 - 實現基類的抽象方法"""
         # 這個方法不會被直接調用，因為我們重寫了search_products
         return []
     
-    async def search_products(self, query: str, max_results: int = 20, standalone_only: bool = False) -> List[Product]:
-        """搜尋產品"""
+    async def search_products(self, query: str, max_results: int = 20, standalone_only: bool = False, category: Optional[str] = None) -> List[Product]:
+        """搜尋產品（從記憶體中的價格表快照查詢，快照過舊時才重新下載），指定 category 時只搜尋該分類"""
         try:
-            search_url = self._build_search_url(query)
-            logger.info(f"原價屋搜尋URL: {search_url}")
-            
-            # 獲取主頁面
-            html = await self._fetch_page(search_url)
-            if not html:
+            index = await coolpc_catalog.ensure(self, Config.COOLPC_CATALOG_MAX_AGE_MINUTES * 60)
+            if index is None:
                 logger.warning("原價屋無法獲取頁面內容")
                 return []
             
-            logger.info(f"原價屋頁面長度: {len(html)} 字符")
+            coolpc_catalog.searches += 1
+            # 有指定分類或可由查詢推測分類時只搜尋該分類（例如 RTX 只搜尋顯示卡），沒有結果時再搜尋整份價格表
+            records = []
+            category = category or index.matcher.guess_category(query)
+            if category is not None:
+                records = index.search(query, max_results, partition=category)
+            if not records:
+                records = index.search(query, max_results)
             
-            # 直接從原始HTML搜尋產品
-            products = self._search_products_direct(query, html, max_results)
+            products = []
+            for record in records:
+                products.append(Product(
+                    store='原價屋',
+                    product_name=record['name'],
+                    price=record['price'],
+                    url=self.evaluate_url,
+                    in_stock=True,
+                    currency="TWD",
+                    image_url=None,
+                    specifications=None,
+                    is_bundle=record['is_bundle'],
+                    category=record['category_key']
+                ))
             
             # 如果只要單獨商品，過濾掉專案商品
             if standalone_only:
@@ -157,114 +287,127 @@ class CoolPCScraper(BaseScraper):
     
     def _is_bundle_product(self, product_name: str) -> bool:
         """檢測是否為專案商品或需搭配商品"""
-        bundle_keywords = [
-            '專案', '需搭配', 'CPU合購', '[需搭配', '[專案',
-            '搭配主板', '搭配CPU', '限定搭配', '合購優惠',
-            'f主板', 'fCPU', 'f搭配'
-        ]
-        
         product_lower = product_name.lower()
-        for keyword in bundle_keywords:
-            if keyword.lower() in product_lower:
-                return True
-        
-        return False
+        return any(keyword in product_lower for keyword in BUNDLE_KEYWORDS)
     
     def _clean_product_name(self, text: str) -> str:
         """清理產品名稱中的特殊字符和編碼問題"""
         
         # 先移除明顯的亂碼字符，只保留可讀字符
         # 保留英文、數字、中文、常見符號
-        cleaned_text = re.sub(r'[^\w\s\-\(\)\[\]/\+\.\u4e00-\u9fff]+', ' ', text)
+        cleaned_text = UNREADABLE_PATTERN.sub(' ', text)
         
         # 清理多餘空格
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text).strip()
+        cleaned_text = WHITESPACE_PATTERN.sub(' ', cleaned_text).strip()
         
         # 基本的字詞替換，修復一些可能的解析問題
-        simple_fixes = {
-            '_': '藍寶石',
-            'fB760': '[需搭配B760]',
-            'fB850': '[需搭配B850]', 
-            'fB860': '[需搭配B860]',
-            'fZ790': '[需搭配Z790]',
-            'fZ890': '[需搭配Z890]',
-            'fX370': '[需搭配X370]',
-            'fX3D': '[需搭配X3D]',
-            'CDO': '主板',
-            'dM': '專案',
-            'AM': '專案',
-            'GRE': 'GRE',
-            'XT': 'XT',
-            'ݷf': '[需搭配]',
-            'ݥf': '[需搭配]',
-            'Xʡ': 'CPU合購',
-            'ݭI': '金屬背板',
-            'U O': '三年保固',
-            'T O': '三年保固',
-            'T OT': '三年保固',
-            'ʤ': '限購一片',
-            'MITxWs': 'MIT台灣製',
-            'a ': '極地 ',
-            't ': '暗黑 '
-        }
-        
-        for old, new in simple_fixes.items():
-            cleaned_text = cleaned_text.replace(old, new)
+        for old, new in NAME_FIXES.items():
+            if old in cleaned_text:
+                cleaned_text = cleaned_text.replace(old, new)
         
         # 清理重複的括號和專案標記
-        cleaned_text = re.sub(r'\[\s*專案\s*\]', '[專案]', cleaned_text)
-        cleaned_text = re.sub(r'\[\s*A\s*-專案\s*\]', '[專案]', cleaned_text)
+        if '[' in cleaned_text:
+            cleaned_text = BUNDLE_TAG_PATTERN.sub('[專案]', cleaned_text)
         
         return cleaned_text.strip()
     
-    def _search_products_direct(self, query: str, html: str, max_results: int) -> List[Product]:
-        """直接從原始HTML搜尋產品"""
-        products = []
-        query_lower = query.lower()
+    def _tokenize_catalog(self, html: str) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+        """單次掃描整份價格表：輸出每個 <OPTION> 商品記錄（含所屬分類 <SELECT>），以及 c*/g* JavaScript 數組
+
+        c<N>/g<N> 數組依位置對應 name=n<N> 選單中的商品，掃描結束後將對應的值寫入記錄的 c / g 欄位。
+        """
+        records = []
+        arrays = {}
+        select_records: Dict[str, List[Dict[str, Any]]] = {}
+        label = None
+        category = None
+        category_key = None
+        select_id = None
+        group = None
+        
+        for token in CATALOG_TOKEN_PATTERN.finditer(html):
+            kind = token.lastgroup
+            
+            if kind == 'td':
+                # 表格欄位文字（純數字為列編號），作為下一個 <SELECT> 的分類名稱
+                text = token.group('td_text').strip()
+                if text and not text.isdigit():
+                    label = text
+            elif kind == 'select':
+                select_id = token.group('select_id')
+                category = label or f"n{select_id}"
+                category_key = self._section_category(category)
+                group = None
+            elif kind == 'select_end':
+                select_id = None
+                category = None
+                category_key = None
+                group = None
+                label = None
+            elif kind == 'optgroup':
+                group = token.group('optgroup_label').strip() or None
+            elif kind == 'option':
+                record = self._parse_option(token.group('option_value'), token.group('option_text'))
+                if record is not None:
+                    record['category'] = category
+                    # 無法對應的價格表分類標示為 other，避免出現在每一種分類篩選中
+                    record['category_key'] = category_key or OTHER_CATEGORY
+                    record['select_id'] = select_id
+                    record['group'] = group
+                    record['c'] = None
+                    record['g'] = None
+                    records.append(record)
+                    select_records.setdefault(select_id, []).append(record)
+            elif kind == 'array':
+                data = token.group('array_data')
+                arrays[token.group('array_name').lower() + token.group('array_id')] = np.array(
+                    [x or 0 for x in data.split(',')] if data else [], dtype=np.float64
+                )
         
-        # 直接搜尋包含查詢詞的OPTION標籤
-        option_pattern = r'<OPTION[^>]*value=(\d+)[^>]*>([^<]*' + re.escape(query) + r'[^<]*)</OPTION>'
-        matches = re.findall(option_pattern, html, re.IGNORECASE | re.DOTALL)
+        # 數組寫在頁面最後的 <script> 中，全部掃描完才能對應回商品
+        for array_name, values in arrays.items():
+            section = select_records.get(array_name[1:], [])
+            if len(values) != len(section):
+                logger.debug(f"原價屋數組 {array_name} 長度 {len(values)} 與選單商品數 {len(section)} 不符")
+            for record, value in zip(section, values.tolist()):
+                record[array_name[0]] = value
         
-        for value, text in matches:
-            text = text.strip()
+        return records, arrays
+    
+    def _section_category(self, label: str) -> Optional[str]:
+        """將價格表的分類名稱對應為商品分類，無法對應時回傳None"""
+        for category, pattern in SECTION_CATEGORIES:
+            if pattern.search(label):
+                return category
+        return None
+    
+    def _parse_option(self, value: str, text: str) -> Optional[Dict[str, Any]]:
+        """解析單一選項的名稱與價格，不是商品（沒有價格）時回傳None"""
+        text = text.strip()
+        
+        # 必須包含價格信息
+        if '$' not in text:
+            return None
+        price_match = PRICE_PATTERN.search(text)
+        if not price_match:
+            return None
+        
+        try:
+            price = float(price_match.group(1))
             
-            # 必須包含價格信息
-            if '$' in text:
-                try:
-                    # 解析價格
-                    price_match = re.search(r'\$(\d+)', text)
-                    if price_match:
-                        price = float(price_match.group(1))
-                        
-                        # 提取產品名稱（去掉價格部分）
-                        product_name = re.sub(r',?\s*\$\d+.*$', '', text).strip()
-                        
-                        # 清理產品名稱中的編碼問題
-                        clean_name = self._clean_product_name(product_name)
-                        
-                        if price > 0 and clean_name:
-                            # 檢測是否為專案或需搭配商品
-                            is_bundle = self._is_bundle_product(clean_name)
-                            
-                            product = Product(
-                                store='原價屋',
-                                product_name=clean_name,
-                                price=price,
-                                url=f"{self.base_url}/evaluate.php",
-                                in_stock=True,
-                                currency="TWD",
-                                image_url=None,
-                                specifications=None,
-                                is_bundle=is_bundle
-                            )
-                            products.append(product)
-                            
-                            if len(products) >= max_results:
-                                break
-                                
-                except (ValueError, AttributeError) as e:
-                    logger.debug(f"原價屋解析產品失敗 {value}: {e}")
-                    continue
+            # 提取產品名稱（去掉價格部分），清理名稱中的編碼問題
+            product_name = text[:price_match.start()].rstrip().rstrip(',').strip()
+            clean_name = self._clean_product_name(product_name)
+        except (ValueError, AttributeError) as e:
+            logger.debug(f"原價屋解析產品失敗 {value}: {e}")
+            return None
         
-        return products 
\ No newline at end of file
+        if price <= 0 or not clean_name:
+            return None
+        return {
+            'name': clean_name,
+            'price': price,
+            'option_value': value,
+            # 檢測是否為專案或需搭配商品
+            'is_bundle': self._is_bundle_product(clean_name)
+        }
\ No newline at end of file
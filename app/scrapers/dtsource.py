@@ -1,3 +1,4 @@
+import asyncio
 import urllib.parse
 from typing import List, Dict, Any
 from bs4 import BeautifulSoup
@@ -7,8 +8,8 @@ from .base_scraper import BaseScraper
 class DTSourceScraper(BaseScraper):
     """德源電腦爬蟲"""
     
-    def __init__(self):
-        super().__init__("德源電腦")
+    def __init__(self, **kwargs):
+        super().__init__("德源電腦", **kwargs)
         self.base_url = "https://www.mypc.com.tw"  # 正確的德源電腦網址
         self.search_url = f"{self.base_url}/product.php"
     
@@ -122,6 +123,16 @@ class DTSourceScraper(BaseScraper):
         
         return False
 
+    async def _check_bundle_only(self, raw_product: Dict[str, Any]) -> bool:
+        """獲取產品詳細頁面檢查是否為合購限定商品"""
+        try:
+            product_detail_html = await self._fetch_shared_page(raw_product['url'])
+            if product_detail_html:
+                return self._is_bundle_only_product(product_detail_html, raw_product['name'])
+        except Exception as e:
+            print(f"DTSource: 無法檢查產品詳細頁面 {raw_product['url']}: {e}")
+        return False
+
     async def search_products(self, product_name: str, check_bundle_only: bool = True) -> List[Product]:
         """搜尋產品"""
         try:
@@ -134,23 +145,24 @@ class DTSourceScraper(BaseScraper):
             soup = self._parse_html(html_content)
             raw_products = self._parse_product_list(soup)
             
+            # 合購限定商品需檢查詳細頁面：前幾個商品並行檢查（請求已由限速器與單一請求合併控管），
+            # 超過上限的商品只依名稱判斷，避免結果多時拖過搜尋時限
+            detail_limit = self.config.DTSOURCE_DETAIL_CHECK_LIMIT if check_bundle_only else 0
+            detail_indices = [index for index, raw_product in enumerate(raw_products) if raw_product.get('url')][:detail_limit]
+            detail_results = await asyncio.gather(*(self._check_bundle_only(raw_products[index]) for index in detail_indices))
+            bundle_only_flags = dict(zip(detail_indices, detail_results))
+            
             products = []
-            for raw_product in raw_products:
+            for index, raw_product in enumerate(raw_products):
                 try:
-                    # 如果需要檢查合購限定商品，則獲取產品詳細頁面
-                    is_bundle_only = False
-                    if check_bundle_only and raw_product.get('url'):
-                        try:
-                            product_detail_html = await self._fetch_page(raw_product['url'])
-                            if product_detail_html:
-                                is_bundle_only = self._is_bundle_only_product(product_detail_html, raw_product['name'])
-                        except Exception as e:
-                            print(f"DTSource: 無法檢查產品詳細頁面 {raw_product['url']}: {e}")
+                    if index in bundle_only_flags:
+                        is_bundle_only = bundle_only_flags[index]
+                    else:
+                        is_bundle_only = self._is_bundle_only_product(raw_product.get('name', ''), raw_product.get('name', ''))
                     
-                    # 如果是合購限定商品，跳過此產品
+                    # 合購限定商品標記為組合商品，由讀取端決定是否排除
                     if is_bundle_only:
-                        print(f"DTSource: 跳過合購限定商品: {raw_product['name'][:50]}...")
-                        continue
+                        print(f"DTSource: 標記合購限定商品: {raw_product['name'][:50]}...")
                     
                     product = Product(
                         store=self.store_name,
@@ -160,7 +172,8 @@ class DTSourceScraper(BaseScraper):
                         in_stock=raw_product['in_stock'],
                         currency="TWD",
                         image_url=raw_product.get('image_url'),
-                        specifications=raw_product.get('specifications')
+                        specifications=raw_product.get('specifications'),
+                        is_bundle=is_bundle_only
                     )
                     products.append(product)
                 except Exception as e:
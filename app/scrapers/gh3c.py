@@ -15,8 +15,8 @@ logger = logging.getLogger(__name__)
 class GH3CScraper(BaseScraper):
     """良興電子爬蟲"""
     
-    def __init__(self):
-        super().__init__("良興電子")
+    def __init__(self, **kwargs):
+        super().__init__("良興電子", **kwargs)
         self.base_url = "https://www.gh3c.com.tw"
         self.search_url = f"{self.base_url}/index.php"
     
@@ -6,8 +6,8 @@ import asyncio
 class MockScraper(BaseScraper):
     """模擬爬蟲，用於測試和展示"""
     
-    def __init__(self):
-        super().__init__("測試商店")
+    def __init__(self, **kwargs):
+        super().__init__("測試商店", **kwargs)
         self.base_url = "https://example.com"
         
         # 模擬產品數據
@@ -3,7 +3,6 @@
 
 import re
 import logging
-import asyncio
 from typing import List, Optional, Dict, Any
 from urllib.parse import urljoin, quote
 from bs4 import BeautifulSoup
@@ -16,8 +15,8 @@ logger = logging.getLogger(__name__)
 class MomoScraper(BaseScraper):
     """momo購物網爬蟲"""
     
-    def __init__(self):
-        super().__init__("momo購物網")
+    def __init__(self, **kwargs):
+        super().__init__("momo購物網", **kwargs)
         self.base_url = "https://www.momoshop.com.tw"
         self.search_url = f"{self.base_url}/search/searchShop.jsp"
     
@@ -50,9 +49,6 @@ class MomoScraper(BaseScraper):
             search_url = self._build_search_url(product_name)
             logger.info(f"momo搜尋URL: {search_url}")
             
-            # 增加延遲避免被封鎖
-            await asyncio.sleep(1)
-            
             html = await self._fetch_page(search_url)
             if not html:
                 logger.error("momo無法獲取網頁內容")
@@ -270,41 +266,36 @@ class MomoScraper(BaseScraper):
     async def get_product_details(self, product_url: str) -> Dict[str, Any]:
         """獲取產品詳細資訊"""
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30),
-                headers=self.get_headers()
-            ) as session:
-                async with session.get(product_url) as response:
-                    if response.status != 200:
-                        return {}
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    details = {}
-                    
-                    # 提取詳細規格
-                    spec_section = soup.find(['div', 'table'], class_=re.compile(r'spec|specification|detail|info'))
-                    if spec_section:
-                        specs = {}
-                        # momo的規格通常在表格中
-                        spec_rows = spec_section.find_all(['tr', 'dt', 'li'])
-                        for row in spec_rows:
-                            text = row.get_text(strip=True)
-                            if ':' in text or '：' in text:
-                                separator = ':' if ':' in text else '：'
-                                parts = text.split(separator, 1)
-                                if len(parts) == 2:
-                                    specs[parts[0].strip()] = parts[1].strip()
-                        details['specifications'] = specs
-                    
-                    # 提取商品描述
-                    desc_section = soup.find('div', class_=re.compile(r'description|intro|detail'))
-                    if desc_section:
-                        details['description'] = desc_section.get_text(strip=True)[:500]  # 限制長度
-                    
-                    return details
-                    
+            html = await self._fetch_page(product_url, headers=self.get_headers())
+            if not html:
+                return {}
+            
+            soup = BeautifulSoup(html, 'html.parser')
+            
+            details = {}
+            
+            # 提取詳細規格
+            spec_section = soup.find(['div', 'table'], class_=re.compile(r'spec|specification|detail|info'))
+            if spec_section:
+                specs = {}
+                # momo的規格通常在表格中
+                spec_rows = spec_section.find_all(['tr', 'dt', 'li'])
+                for row in spec_rows:
+                    text = row.get_text(strip=True)
+                    if ':' in text or '：' in text:
+                        separator = ':' if ':' in text else '：'
+                        parts = text.split(separator, 1)
+                        if len(parts) == 2:
+                            specs[parts[0].strip()] = parts[1].strip()
+                details['specifications'] = specs
+            
+            # 提取商品描述
+            desc_section = soup.find('div', class_=re.compile(r'description|intro|detail'))
+            if desc_section:
+                details['description'] = desc_section.get_text(strip=True)[:500]  # 限制長度
+            
+            return details
+            
         except Exception as e:
             logger.error(f"momo獲取產品詳情失敗: {e}")
             return {} 
\ No newline at end of file
@@ -17,8 +17,8 @@ logger = logging.getLogger(__name__)
 class PChomeScraper(BaseScraper):
     """PChome 24h購物網爬蟲"""
     
-    def __init__(self):
-        super().__init__("PChome 24h")
+    def __init__(self, **kwargs):
+        super().__init__("PChome 24h", **kwargs)
         self.base_url = "https://24h.pchome.com.tw"
         self.search_url = f"{self.base_url}/search"
     
@@ -17,8 +17,8 @@ logger = logging.getLogger(__name__)
 class SanjingScraper(BaseScraper):
     """三井3C購物網爬蟲"""
     
-    def __init__(self):
-        super().__init__("三井3C")
+    def __init__(self, **kwargs):
+        super().__init__("三井3C", **kwargs)
         self.base_url = "https://www.sanjing3c.com.tw"
         self.search_url = "https://www.sanjing3c.com.tw/search.php"
     
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
 import json
@@ -18,8 +17,8 @@ logger = logging.getLogger(__name__)
 class SapphireScraper(BaseScraper):
     """藍寶石官網爬蟲"""
     
-    def __init__(self):
-        super().__init__("藍寶石官網")
+    def __init__(self, **kwargs):
+        super().__init__("藍寶石官網", **kwargs)
         self.base_url = "https://sapphiretech.cyberbiz.co"
         self.search_url = f"{self.base_url}/search"
         self.name = "SapphireScraper"
@@ -38,42 +37,35 @@ class SapphireScraper(BaseScraper):
         try:
             logger.info(f"藍寶石官網搜尋: {query}")
             
-            async with aiohttp.ClientSession() as session:
-                # 首先獲取搜尋頁面
-                search_page_url = f"{self.search_url}?q={quote_plus(query)}"
-                logger.info(f"藍寶石搜尋URL: {search_page_url}")
-                
-                async with session.get(
-                    search_page_url,
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        logger.error(f"藍寶石搜尋請求失敗，狀態碼: {response.status}")
-                        return []
-                    
-                    html_content = await response.text()
-                    logger.info(f"藍寶石獲取HTML內容，長度: {len(html_content)}")
-                    
-                    # 解析HTML
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 方法1：嘗試從HTML直接解析產品
-                    products = await self._extract_products_from_html(soup, session)
-                    
-                    # 方法2：如果HTML方法失敗，嘗試從JavaScript中提取產品數據
-                    if not products:
-                        products = await self._extract_products_from_js(soup, session)
-                    
-                    logger.info(f"藍寶石找到 {len(products)} 個產品")
-                    return products[:max_results]
-                    
+            # 首先獲取搜尋頁面
+            search_page_url = f"{self.search_url}?q={quote_plus(query)}"
+            logger.info(f"藍寶石搜尋URL: {search_page_url}")
+            
+            html_content = await self._fetch_page(search_page_url, headers=self.headers)
+            if not html_content:
+                logger.error("藍寶石搜尋請求失敗，無法獲取頁面內容")
+                return []
+            
+            logger.info(f"藍寶石獲取HTML內容，長度: {len(html_content)}")
+            
+            # 解析HTML
+            soup = BeautifulSoup(html_content, 'html.parser')
+            
+            # 方法1：嘗試從HTML直接解析產品
+            products = await self._extract_products_from_html(soup)
+            
+            # 方法2：如果HTML方法失敗，嘗試從JavaScript中提取產品數據
+            if not products:
+                products = await self._extract_products_from_js(soup)
+            
+            logger.info(f"藍寶石找到 {len(products)} 個產品")
+            return products[:max_results]
+            
         except Exception as e:
             logger.error(f"藍寶石搜尋過程中發生錯誤: {e}")
             return []
     
-    async def _extract_products_from_html(self, soup: BeautifulSoup, session: aiohttp.ClientSession) -> List[Product]:
+    async def _extract_products_from_html(self, soup: BeautifulSoup) -> List[Product]:
         """從HTML直接解析產品"""
         products = []
         
@@ -129,7 +121,7 @@ class SapphireScraper(BaseScraper):
             logger.error(f"從HTML解析產品時發生錯誤: {e}")
             return []
     
-    async def _extract_products_from_js(self, soup: BeautifulSoup, session: aiohttp.ClientSession) -> List[Product]:
+    async def _extract_products_from_js(self, soup: BeautifulSoup) -> List[Product]:
         """從JavaScript數據中提取產品"""
         products = []
         
@@ -226,7 +218,7 @@ class SapphireScraper(BaseScraper):
                         # 如果沒有找到對應的產品，嘗試從產品頁面獲取更多信息
                         if not updated:
                             # 嘗試從搜尋結果頁面提取價格和URL
-                            price, url = await self._try_extract_price_and_url(clean_name, session)
+                            price, url = await self._try_extract_price_and_url(clean_name)
                             
                             product = Product(
                                 store="藍寶石官網",
@@ -408,7 +400,7 @@ class SapphireScraper(BaseScraper):
         
         return "需確認庫存"
     
-    async def _try_extract_price_and_url(self, product_name: str, session: aiohttp.ClientSession) -> tuple:
+    async def _try_extract_price_and_url(self, product_name: str) -> tuple:
         """嘗試從產品名稱提取價格和URL"""
         try:
             # 從產品名稱中提取可能的型號
@@ -598,42 +590,35 @@ class SapphireScraper(BaseScraper):
     async def get_product_details(self, product_url: str) -> Dict[str, Any]:
         """獲取產品詳細資訊"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    product_url,
-                    headers=self.headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status != 200:
-                        return {}
-                    
-                    html_content = await response.text()
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # 提取詳細資訊
-                    details = {}
-                    
-                    # 產品描述
-                    desc_selectors = [
-                        '.product-description', '.description', 
-                        '.product-details', '[data-description]'
-                    ]
-                    description = self._extract_text_by_selectors(soup, desc_selectors)
-                    if description:
-                        details['description'] = description
-                    
-                    # 規格資訊
-                    spec_selectors = [
-                        '.specifications', '.specs', '.product-specs',
-                        '.technical-details', '[data-specs]'
-                    ]
-                    specs = self._extract_text_by_selectors(soup, spec_selectors)
-                    if specs:
-                        details['specifications'] = specs
-                    
-                    return details
-                    
+            html_content = await self._fetch_page(product_url, headers=self.headers)
+            if not html_content:
+                return {}
+            
+            soup = BeautifulSoup(html_content, 'html.parser')
+            
+            # 提取詳細資訊
+            details = {}
+            
+            # 產品描述
+            desc_selectors = [
+                '.product-description', '.description', 
+                '.product-details', '[data-description]'
+            ]
+            description = self._extract_text_by_selectors(soup, desc_selectors)
+            if description:
+                details['description'] = description
+            
+            # 規格資訊
+            spec_selectors = [
+                '.specifications', '.specs', '.product-specs',
+                '.technical-details', '[data-specs]'
+            ]
+            specs = self._extract_text_by_selectors(soup, spec_selectors)
+            if specs:
+                details['specifications'] = specs
+            
+            return details
+            
         except Exception as e:
             logger.error(f"獲取產品詳情時發生錯誤: {e}")
             return {}
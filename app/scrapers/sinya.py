@@ -11,8 +11,8 @@ from app.models.product import Product
 class SinyaScraper(BaseScraper):
     """欣亞數位爬蟲"""
     
-    def __init__(self):
-        super().__init__("欣亞數位")
+    def __init__(self, **kwargs):
+        super().__init__("欣亞數位", **kwargs)
         self.base_url = "https://www.sinya.com.tw"
         self.search_url = f"{self.base_url}/search/0"
     
@@ -244,7 +244,7 @@ class SinyaScraper(BaseScraper):
     async def _check_product_stock_detail(self, product_url: str) -> str:
         """檢查產品詳細頁面的庫存狀態"""
         try:
-            html_content = await self._fetch_page(product_url)
+            html_content = await self._fetch_shared_page(product_url)
             if html_content:
                 soup = BeautifulSoup(html_content, 'html.parser')
                 page_text = soup.get_text()
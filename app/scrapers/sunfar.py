@@ -6,7 +6,6 @@ import json
 import logging
 from typing import List, Optional, Dict, Any
 from urllib.parse import urljoin, quote
-import aiohttp
 from bs4 import BeautifulSoup
 
 from app.models.product import Product
@@ -17,8 +16,8 @@ logger = logging.getLogger(__name__)
 class SunfarScraper(BaseScraper):
     """順發電腦爬蟲"""
     
-    def __init__(self):
-        super().__init__("順發電腦")
+    def __init__(self, **kwargs):
+        super().__init__("順發電腦", **kwargs)
         self.base_url = "https://www.isunfar.com.tw"
         self.search_url = f"{self.base_url}/product/search.aspx"
     
@@ -31,20 +30,15 @@ class SunfarScraper(BaseScraper):
             search_url = f"{self.search_url}?b=undefined&keyword={quote(query)}"
             logger.info(f"順發電腦搜尋URL: {search_url}")
             
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30),
-                headers=self.get_headers()
-            ) as session:
-                async with session.get(search_url) as response:
-                    if response.status != 200:
-                        logger.error(f"順發電腦請求失敗: {response.status}")
-                        return []
-                    
-                    html = await response.text()
-                    logger.info(f"順發電腦頁面長度: {len(html)} 字符")
-                    
-                                # 從JavaScript中提取產品數據
-            products = await self._extract_products_from_js(html, session)
+            html = await self._fetch_page(search_url, headers=self.get_headers())
+            if not html:
+                logger.error("順發電腦無法獲取網頁內容")
+                return []
+            
+            logger.info(f"順發電腦頁面長度: {len(html)} 字符")
+            
+            # 從JavaScript中提取產品數據
+            products = await self._extract_products_from_js(html)
             
             # 去除重複產品（基於產品ID）
             unique_products = []
@@ -76,7 +70,7 @@ class SunfarScraper(BaseScraper):
             traceback.print_exc()
             return []
     
-    async def _extract_products_from_js(self, html: str, session: aiohttp.ClientSession) -> List[Product]:
+    async def _extract_products_from_js(self, html: str) -> List[Product]:
         """從JavaScript中提取產品數據"""
         products = []
         
@@ -239,44 +233,39 @@ class SunfarScraper(BaseScraper):
     async def get_product_details(self, product_url: str) -> Dict[str, Any]:
         """獲取產品詳細資訊"""
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=30),
-                headers=self.get_headers()
-            ) as session:
-                async with session.get(product_url) as response:
-                    if response.status != 200:
-                        return {}
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    details = {}
-                    
-                    # 提取詳細規格
-                    spec_table = soup.find('table', class_='spec-table')
-                    if spec_table:
-                        specs = []
-                        for row in spec_table.find_all('tr'):
-                            cells = row.find_all(['td', 'th'])
-                            if len(cells) >= 2:
-                                key = cells[0].get_text(strip=True)
-                                value = cells[1].get_text(strip=True)
-                                if key and value:
-                                    specs.append(f"{key}: {value}")
-                        details['specifications'] = '; '.join(specs)
-                    
-                    # 提取更多圖片
-                    images = []
-                    img_elements = soup.find_all('img', src=True)
-                    for img in img_elements:
-                        src = img.get('src')
-                        if src and 'product' in src.lower():
-                            full_url = urljoin(self.base_url, src)
-                            images.append(full_url)
-                    details['images'] = images[:5]  # 最多5張圖片
-                    
-                    return details
-                    
+            html = await self._fetch_page(product_url, headers=self.get_headers())
+            if not html:
+                return {}
+            
+            soup = BeautifulSoup(html, 'html.parser')
+            
+            details = {}
+            
+            # 提取詳細規格
+            spec_table = soup.find('table', class_='spec-table')
+            if spec_table:
+                specs = []
+                for row in spec_table.find_all('tr'):
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) >= 2:
+                        key = cells[0].get_text(strip=True)
+                        value = cells[1].get_text(strip=True)
+                        if key and value:
+                            specs.append(f"{key}: {value}")
+                details['specifications'] = '; '.join(specs)
+            
+            # 提取更多圖片
+            images = []
+            img_elements = soup.find_all('img', src=True)
+            for img in img_elements:
+                src = img.get('src')
+                if src and 'product' in src.lower():
+                    full_url = urljoin(self.base_url, src)
+                    images.append(full_url)
+            details['images'] = images[:5]  # 最多5張圖片
+            
+            return details
+            
         except Exception as e:
             logger.error(f"獲取產品詳細資訊失敗: {e}")
             return {}
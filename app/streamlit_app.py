@@ -249,6 +249,10 @@ def display_search_results(search_result, per_page):
     if search_result["failed_stores"]:
         st.warning(f"⚠️ 以下賣場搜尋失敗：{', '.join(search_result['failed_stores'])}")
     
+    # 顯示逾時的賣場
+    if search_result.get("timed_out_stores"):
+        st.info(f"⏱️ 以下賣場超過搜尋時限，本次結果未包含：{', '.join(search_result['timed_out_stores'])}")
+    
     # 顯示產品列表
     st.subheader("📊 比價結果")
     
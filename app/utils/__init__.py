@@ -1,5 +1,16 @@
 from .cache import CacheManager
+from .lru_cache import LRUTTLCache
+from .cache_backend import CacheBackend, MemoryCacheBackend, RedisCacheBackend, SqliteCacheBackend, TieredCacheBackend
 from .product_matcher import ProductMatcher
 from .price_formatter import PriceFormatter
+from .http_pool import HttpSessionPool
+from .http_cache import ValidatorCache, ResponseCache
+from .rate_limiter import RateLimiter
+from .circuit_breaker import CircuitBreaker
+from .single_flight import SingleFlight
+from .popularity import PopularityTracker
+from .catalog_index import CatalogIndex
+from .price_vector import PriceVector
+from .similarity import SimilarityKernel, create_similarity_kernel
 
-__all__ = ["CacheManager", "ProductMatcher", "PriceFormatter"] 
\ No newline at end of file
+__all__ = ["CacheManager", "LRUTTLCache", "CacheBackend", "MemoryCacheBackend", "RedisCacheBackend", "SqliteCacheBackend", "TieredCacheBackend", "ProductMatcher", "PriceFormatter", "HttpSessionPool", "ValidatorCache", "ResponseCache", "RateLimiter", "CircuitBreaker", "SingleFlight", "PopularityTracker", "CatalogIndex", "PriceVector", "SimilarityKernel", "create_similarity_kernel"]
\ No newline at end of file
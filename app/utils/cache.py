@@ -1,87 +1,135 @@
+import asyncio
 import hashlib
-import json
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import time
+from typing import Callable, Optional, Dict, Any, List, Tuple
 from app.config import Config
+from app.utils.cache_backend import CacheBackend, create_cache_backend
+from app.utils.product_matcher import ProductMatcher
+
+# 商店快取項目的格式版本，格式變更時遞增，避免讀到持久層中的舊格式
+STORE_ENTRY_VERSION = 4
 
 class CacheManager:
-    """記憶體快取管理器"""
+    """搜尋結果快取管理器，實際儲存由可抽換的快取後端負責（記憶體或 Redis）"""
     
-    def __init__(self):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, backend: Optional[CacheBackend] = None):
         self.max_size = Config.MAX_CACHE_SIZE
+        self.max_bytes = Config.MAX_CACHE_BYTES
         self.expire_minutes = Config.CACHE_EXPIRE_MINUTES
+        self.stale_max_minutes = Config.CACHE_STALE_MAX_MINUTES
+        self.matcher = ProductMatcher()
+        self.cache = backend if backend is not None else create_cache_backend(self.max_size, self.expire_minutes * 60, self.max_bytes)
+    
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """在事件迴圈中呼叫快取操作：後端會以網路或磁碟I/O阻塞時（Redis、SQLite、分層）改在執行緒中執行"""
+        if self.cache.blocking_io:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+    
+    def _hash(self, text: str) -> str:
+        return hashlib.md5(text.encode()).hexdigest()
+    
+    def _store_scope(self, store_key: str, product_name: str, category: Optional[str]) -> str:
+        """商店查詢範圍：商店、查詢標準形式，以及影響該商店結果的分類"""
+        scope = f"{store_key}|{self.matcher.canonicalize_query(product_name)}"
+        return f"{scope}|{category}" if category else scope
+    
+    def _generate_store_key(self, store_key: str, product_name: str, category: Optional[str] = None) -> str:
+        """生成單一商店搜尋結果的快取鍵值（含相似度演算法：項目內的分數與相關性過濾結果隨演算法不同）"""
+        kernel = self.matcher.similarity_kernel.name
+        return self._hash(f"v{STORE_ENTRY_VERSION}|{kernel}|{self._store_scope(store_key, product_name, category)}")
+    
+    def get_store_ttl_minutes(self, store_key: str) -> int:
+        """取得商店結果的快取時間（分鐘）"""
+        return Config.STORE_CACHE_TTL_MINUTES.get(store_key, self.expire_minutes)
+    
+    def get_store(self, store_key: str, product_name: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """取得單一商店的快取搜尋結果（可能已過期但仍在可接受的過期時間內）"""
+        return self.cache.get(self._generate_store_key(store_key, product_name, category))
+    
+    def set_store(self, store_key: str, product_name: str, columns: Dict[str, List[Any]], category: Optional[str] = None):
+        """設定單一商店的搜尋結果（預先序列化的JSON列與欄位式索引），保留到快取時間加上可接受的過期時間"""
+        ttl_minutes = self.get_store_ttl_minutes(store_key)
+        scraped_at = time.time()
+        self.cache.set(
+            self._generate_store_key(store_key, product_name, category),
+            {
+                **columns,
+                "scraped_at": scraped_at,  # UNIX 時間，後端可直接以 JSON 儲存
+                "expires_at": scraped_at + ttl_minutes * 60
+            },
+            (ttl_minutes + self.stale_max_minutes) * 60
+        )
+    
+    def _generate_negative_key(self, store_key: str, product_name: str, category: Optional[str] = None) -> str:
+        """生成商店無結果記錄的快取鍵值"""
+        return self._hash(f"neg|{self._store_scope(store_key, product_name, category)}")
     
-    def _generate_key(self, product_name: str) -> str:
-        """生成快取鍵值"""
-        return hashlib.md5(product_name.lower().encode()).hexdigest()
-    
-    def _is_expired(self, cache_entry: Dict[str, Any]) -> bool:
-        """檢查快取是否過期"""
-        expire_time = cache_entry.get("expires_at")
-        if not expire_time:
-            return True
-        return datetime.now() > expire_time
-    
-    def _cleanup_expired(self):
-        """清理過期的快取項目"""
-        expired_keys = []
-        for key, entry in self.cache.items():
-            if self._is_expired(entry):
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.cache[key]
-    
-    def _manage_size(self):
-        """管理快取大小"""
-        if len(self.cache) >= self.max_size:
-            # 移除最舊的項目
-            oldest_key = min(
-                self.cache.keys(), 
-                key=lambda k: self.cache[k].get("created_at", datetime.min)
-            )
-            del self.cache[oldest_key]
-    
-    def get(self, product_name: str) -> Optional[Dict[str, Any]]:
-        """取得快取資料"""
-        self._cleanup_expired()
-        
-        key = self._generate_key(product_name)
-        cache_entry = self.cache.get(key)
-        
-        if cache_entry and not self._is_expired(cache_entry):
-            return cache_entry["data"]
-        
-        # 如果快取不存在或已過期，移除它
-        if key in self.cache:
-            del self.cache[key]
-        
-        return None
-    
-    def set(self, product_name: str, data: Dict[str, Any]):
-        """設定快取資料"""
-        self._cleanup_expired()
-        self._manage_size()
-        
-        key = self._generate_key(product_name)
-        expires_at = datetime.now() + timedelta(minutes=self.expire_minutes)
-        
-        self.cache[key] = {
-            "data": data,
-            "created_at": datetime.now(),
-            "expires_at": expires_at
-        }
+    def set_store_empty(self, store_key: str, product_name: str, category: Optional[str] = None):
+        """記錄商店對此查詢沒有結果（短時間的負向快取）"""
+        if Config.NEGATIVE_CACHE_TTL_SECONDS > 0:
+            self.cache.set(self._generate_negative_key(store_key, product_name, category), time.time(), Config.NEGATIVE_CACHE_TTL_SECONDS)
+    
+    def is_store_empty(self, store_key: str, product_name: str, category: Optional[str] = None) -> bool:
+        """商店最近是否已確認此查詢沒有結果"""
+        return self.cache.get(self._generate_negative_key(store_key, product_name, category)) is not None
+    
+    def clear_store_empty(self, store_key: str, product_name: str, category: Optional[str] = None):
+        """商店有結果時移除負向快取記錄"""
+        self.cache.delete(self._generate_negative_key(store_key, product_name, category))
+    
+    def lookup_stores(self, store_keys: List[str], product_name: str, categories: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """一次讀取多個商店的快取結果，回傳 (有快取的商店項目, 沒有快取但最近確認無結果的商店)
+
+        categories 為結果隨分類不同的商店 → 分類，這些商店依分類分開快取。
+        """
+        categories = categories or {}
+        entries = {}
+        empty_stores = []
+        for store_key in store_keys:
+            category = categories.get(store_key)
+            entry = self.get_store(store_key, product_name, category)
+            if entry is not None:
+                entries[store_key] = entry
+            elif self.is_store_empty(store_key, product_name, category):
+                empty_stores.append(store_key)
+        return entries, empty_stores
+    
+    def store_results(self, product_name: str, entries: Dict[str, Dict[str, List[Any]]], empty_stores: List[str], categories: Optional[Dict[str, str]] = None):
+        """一次寫入多個商店的搜尋結果與無結果記錄（categories 同 lookup_stores）"""
+        categories = categories or {}
+        for store_key, columns in entries.items():
+            self.set_store(store_key, product_name, columns, categories.get(store_key))
+            self.clear_store_empty(store_key, product_name, categories.get(store_key))
+        for store_key in empty_stores:
+            self.set_store_empty(store_key, product_name, categories.get(store_key))
+    
+    def is_stale(self, entry: Dict[str, Any]) -> bool:
+        """判斷商店快取項目是否已過期（需要背景更新）"""
+        return time.time() >= entry["expires_at"]
+    
+    def acquire_lease(self, name: str, ttl_seconds: float) -> bool:
+        """取得具時效的租約（set-if-absent），多個 worker 中只有一個會成功"""
+        return self.cache.set_if_absent(f"lease:{self._hash(name)}", time.time(), ttl_seconds)
+    
+    def warm_start(self) -> int:
+        """啟動時將持久層中最常用的項目載入記憶體"""
+        return self.cache.warm_start(Config.CACHE_WARM_START_ITEMS)
     
     def clear(self):
         """清空所有快取"""
         self.cache.clear()
     
+    def close(self):
+        """關閉快取後端的連線"""
+        self.cache.close()
+    
     def get_stats(self) -> Dict[str, Any]:
-        """取得快取統計資訊"""
-        self._cleanup_expired()
+        """取得快取統計資訊（不在此清理過期項目，清理由各後端的寫入路徑負責）"""
         return {
             "total_items": len(self.cache),
             "max_size": self.max_size,
-            "expire_minutes": self.expire_minutes
-        } 
\ No newline at end of file
+            "expire_minutes": self.expire_minutes,
+            "stale_max_minutes": self.stale_max_minutes,
+            **self.cache.get_stats()
+        }
\ No newline at end of file
@@ -0,0 +1,533 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, unquote
+from app.config import Config
+from app.utils.lru_cache import LRUTTLCache
+
+class CacheBackend:
+    """快取後端介面：CacheManager 透過此介面存取實際的儲存位置"""
+
+    name = "base"
+    # 存取會以網路或磁碟I/O阻塞時為True，呼叫端應在執行緒中執行，避免阻塞事件迴圈
+    blocking_io = False
+
+    def get(self, key: str) -> Optional[Any]:
+        """取得資料，不存在或過期時回傳None"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        """設定資料與存活時間"""
+        raise NotImplementedError
+
+    def set_if_absent(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        """鍵值不存在時才設定（原子操作），成功設定時回傳True"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """刪除單一項目"""
+        raise NotImplementedError
+
+    def clear(self):
+        """清空所有項目"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """清理已過期的項目（後端自行處理過期時不需實作）"""
+
+    def warm_start(self, limit: int) -> int:
+        """啟動時預先載入常用項目（只有分層後端需要），回傳載入數量"""
+        return 0
+
+    def close(self):
+        """關閉連線（沒有連線的後端不需實作）"""
+
+    def __len__(self) -> int:
+        return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得後端統計資訊"""
+        return {"backend": self.name}
+
+def serialized_size(value: Any) -> int:
+    """估算項目的記憶體用量：以 JSON 序列化後的位元組數計算"""
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+class MemoryCacheBackend(CacheBackend):
+    """行程內記憶體後端（LRU + TTL），每個 worker 各自一份，依位元組上限淘汰"""
+
+    name = "memory"
+
+    def __init__(self, max_size: int, ttl_seconds: float, max_bytes: int = 0):
+        self.cache = LRUTTLCache(max_size, ttl_seconds, max_bytes=max_bytes, sizer=serialized_size)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        self.cache.set(key, value, ttl_seconds=ttl_seconds)
+
+    def set_if_absent(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        # 單一執行緒的事件迴圈中，檢查與設定之間不會被打斷
+        if key in self.cache:
+            return False
+        self.cache.set(key, value, ttl_seconds=ttl_seconds)
+        return True
+
+    def delete(self, key: str):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+    def purge_expired(self):
+        self.cache.purge_expired()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.cache.get_stats()}
+
+class RedisProtocolError(Exception):
+    """Redis 伺服器回傳錯誤"""
+
+class RedisCacheBackend(CacheBackend):
+    """Redis 協定（RESP）後端，多個 worker / 主機共用同一份快取
+
+    值以 JSON 儲存；連線失敗時視為未命中，並在一段退避時間內直接略過存取，不中斷也不拖慢搜尋。
+    """
+
+    name = "redis"
+    blocking_io = True
+
+    def __init__(self, url: Optional[str] = None, key_prefix: Optional[str] = None, timeout_seconds: Optional[float] = None):
+        parsed = urlparse(url or Config.CACHE_REDIS_URL)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix if key_prefix is not None else Config.CACHE_KEY_PREFIX
+        self.timeout_seconds = timeout_seconds or Config.CACHE_REDIS_TIMEOUT_SECONDS
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self.backoff_seconds = Config.CACHE_REDIS_BACKOFF_SECONDS
+        self._down_until = 0.0
+        self._len_cache: Tuple[float, int] = (0.0, 0)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.skipped = 0
+
+    def _connect(self):
+        """建立連線並完成認證與選擇資料庫"""
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout_seconds)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._send_command("AUTH", self.password)
+        if self.db:
+            self._send_command("SELECT", str(self.db))
+
+    def _disconnect(self):
+        """關閉連線（下次存取時重新連線）"""
+        try:
+            if self._reader is not None:
+                self._reader.close()
+            if self._sock is not None:
+                self._sock.close()
+        except OSError:
+            pass
+        self._sock = None
+        self._reader = None
+
+    def _encode_command(self, *args: Any) -> bytes:
+        """將指令編碼為 RESP 陣列"""
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        """讀取單一 RESP 回應"""
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis 連線已關閉")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            raise RedisProtocolError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [self._read_reply() for _ in range(count)]
+        raise RedisProtocolError(f"無法解析的回應: {line!r}")
+
+    def _send_command(self, *args: Any) -> Any:
+        self._sock.sendall(self._encode_command(*args))
+        return self._read_reply()
+
+    def _execute(self, *args: Any) -> Any:
+        """執行指令；既有連線中斷時重新連線並重試一次，新建連線失敗則不重試"""
+        with self._lock:
+            for attempt in range(2):
+                reused = self._sock is not None
+                try:
+                    if not reused:
+                        self._connect()
+                    return self._send_command(*args)
+                except (OSError, ConnectionError) as e:
+                    self._disconnect()
+                    if attempt == 1 or not reused:
+                        raise
+                    print(f"Redis 連線中斷，重新連線: {e}")
+
+    def _safe_execute(self, *args: Any, default: Any = None) -> Any:
+        """執行指令，失敗時記錄並回傳預設值；連線失敗後的退避時間內直接回傳預設值"""
+        if time.monotonic() < self._down_until:
+            self.skipped += 1
+            return default
+        try:
+            return self._execute(*args)
+        except (OSError, ConnectionError) as e:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.backoff_seconds
+            print(f"Redis 指令 {args[0]} 失敗，{self.backoff_seconds:g} 秒內略過快取: {e}")
+            return default
+        except RedisProtocolError as e:
+            self.errors += 1
+            print(f"Redis 指令 {args[0]} 失敗: {e}")
+            return default
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _ttl_ms(self, ttl_seconds: float) -> int:
+        return max(1, int(ttl_seconds * 1000))
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self._safe_execute("GET", self._full_key(key))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(data)
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        payload = json.dumps(value, ensure_ascii=False)
+        self._safe_execute("SET", self._full_key(key), payload, "PX", self._ttl_ms(ttl_seconds))
+
+    def set_if_absent(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        payload = json.dumps(value, ensure_ascii=False)
+        reply = self._safe_execute("SET", self._full_key(key), payload, "PX", self._ttl_ms(ttl_seconds), "NX")
+        return reply == "OK"
+
+    def delete(self, key: str):
+        self._safe_execute("DEL", self._full_key(key))
+
+    def _scan_keys(self) -> List[bytes]:
+        """以 SCAN 列出本應用程式前綴的所有鍵值"""
+        keys = []
+        cursor = "0"
+        while True:
+            reply = self._safe_execute("SCAN", cursor, "MATCH", f"{self.key_prefix}*", "COUNT", 500)
+            if not reply:
+                break
+            cursor = reply[0].decode("ascii")
+            keys.extend(reply[1])
+            if cursor == "0":
+                break
+        return keys
+
+    def clear(self):
+        # 只刪除本應用程式前綴的鍵值，不影響同一資料庫的其他資料
+        keys = self._scan_keys()
+        for start in range(0, len(keys), 500):
+            self._safe_execute("DEL", *keys[start:start + 500])
+        self._len_cache = (0.0, 0)
+
+    def __len__(self) -> int:
+        # SCAN 需走訪整個鍵值空間，數量只在快取時間過後才重新計算
+        counted_at, count = self._len_cache
+        if time.monotonic() - counted_at >= Config.CACHE_REDIS_LEN_CACHE_SECONDS:
+            count = len(self._scan_keys())
+            self._len_cache = (time.monotonic(), count)
+        return count
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "server": f"{self.host}:{self.port}/{self.db}",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "available": time.monotonic() >= self._down_until
+        }
+
+class SqliteCacheBackend(CacheBackend):
+    """本機 SQLite（WAL 模式）持久化後端：重新啟動後仍保留，容量不受記憶體限制"""
+
+    name = "sqlite"
+    # 同一主機的多個 worker 共用 WAL 檔案，寫入鎖競爭時最多等待 timeout 秒
+    blocking_io = True
+
+    def __init__(self, path: Optional[str] = None, max_items: Optional[int] = None):
+        self.path = path or Config.CACHE_L2_PATH
+        self.max_items = max_items if max_items is not None else Config.CACHE_L2_MAX_ITEMS
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # isolation_level=None：自動提交，每個寫入各自成為一筆交易
+        self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_hits ON entries (hits DESC)")
+        self._writes_since_trim = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_with_expiry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """取得資料與到期的 UNIX 時間，並累計命中次數"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET hits = hits + 1 WHERE key = ?", (key,))
+        self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_with_expiry(key)
+        return entry[0] if entry else None
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            # 覆寫時保留累計的命中次數，作為預熱排序依據
+            self._conn.execute(
+                "INSERT INTO entries (key, value, expires_at, hits, updated_at) VALUES (?, ?, ?, 0, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at,"
+                " updated_at = excluded.updated_at",
+                (key, payload, now + ttl_seconds, now)
+            )
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= 500:
+                self._trim(now)
+
+    def set_if_absent(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            # 單一 UPSERT 陳述式：不存在或已過期時才寫入，同一主機的多個 worker 也是原子操作
+            cursor = self._conn.execute(
+                "INSERT INTO entries (key, value, expires_at, hits, updated_at) VALUES (?, ?, ?, 0, ?)"
+                " ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at,"
+                " updated_at = excluded.updated_at WHERE entries.expires_at <= ?",
+                (key, payload, now + ttl_seconds, now, now)
+            )
+            return cursor.rowcount == 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def _trim(self, now: float):
+        """刪除過期項目，超過容量時刪除最久未更新的項目"""
+        self._writes_since_trim = 0
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        overflow = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_items
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY updated_at LIMIT ?)", (overflow,)
+            )
+
+    def purge_expired(self):
+        with self._lock:
+            self._trim(time.time())
+
+    def add_hits(self, counts: Dict[str, int]):
+        """批次累計命中次數（L1 命中的項目不會讀取 L2）"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE entries SET hits = hits + ? WHERE key = ?",
+                [(count, key) for key, count in counts.items()]
+            )
+
+    def hottest(self, limit: int) -> List[Tuple[str, Any, float]]:
+        """依命中次數取得最常用且未過期的項目 (鍵值, 資料, 到期時間)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, expires_at FROM entries WHERE expires_at > ? ORDER BY hits DESC LIMIT ?",
+                (time.time(), limit)
+            ).fetchall()
+        return [(key, json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "items": len(self),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0
+        }
+
+class TieredCacheBackend(CacheBackend):
+    """兩層快取：L1 記憶體，L2 SQLite；L1 未命中時讀取 L2 並回填，寫入時兩層同時寫入"""
+
+    name = "tiered"
+    # L2 為 SQLite，整個操作在執行緒中執行；L1 與命中計數由 _l1_lock 保護
+    blocking_io = True
+
+    def __init__(self, l1: MemoryCacheBackend, l2: SqliteCacheBackend, hit_flush_threshold: int = 100):
+        self.l1 = l1
+        self.l2 = l2
+        self._l1_lock = threading.Lock()
+        self.promotions = 0
+        self.hit_flush_threshold = hit_flush_threshold
+        self._pending_hits: Dict[str, int] = {}
+        self._pending_hit_total = 0
+
+    def _record_l1_hit(self, key: str) -> bool:
+        """累計 L1 命中次數（呼叫端持有 _l1_lock），回傳是否達到批次寫回 L2 的門檻"""
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        self._pending_hit_total += 1
+        return self._pending_hit_total >= self.hit_flush_threshold
+
+    def _flush_hits(self):
+        with self._l1_lock:
+            pending_hits = self._pending_hits
+            self._pending_hits = {}
+            self._pending_hit_total = 0
+        if pending_hits:
+            self.l2.add_hits(pending_hits)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._l1_lock:
+            value = self.l1.get(key)
+            flush = value is not None and self._record_l1_hit(key)
+        if flush:
+            # 命中次數作為預熱排序依據，批次寫回 L2
+            self._flush_hits()
+        if value is not None:
+            return value
+
+        entry = self.l2.get_with_expiry(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        with self._l1_lock:
+            self.l1.set(key, value, expires_at - time.time())
+            self.promotions += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float):
+        with self._l1_lock:
+            self.l1.set(key, value, ttl_seconds)
+        self.l2.set(key, value, ttl_seconds)
+
+    def set_if_absent(self, key: str, value: Any, ttl_seconds: float) -> bool:
+        # 以 L2 判斷，讓同一主機上的多個 worker 也能互斥
+        return self.l2.set_if_absent(key, value, ttl_seconds)
+
+    def delete(self, key: str):
+        with self._l1_lock:
+            self.l1.delete(key)
+        self.l2.delete(key)
+
+    def clear(self):
+        with self._l1_lock:
+            self.l1.clear()
+        self.l2.clear()
+
+    def purge_expired(self):
+        with self._l1_lock:
+            self.l1.purge_expired()
+        self.l2.purge_expired()
+
+    def warm_start(self, limit: int) -> int:
+        """將 L2 中最常用的項目預先載入 L1，回傳載入數量"""
+        now = time.time()
+        entries = self.l2.hottest(limit)
+        with self._l1_lock:
+            # 由冷到熱寫入，讓最熱門的項目位於 LRU 最新端
+            for key, value, expires_at in reversed(entries):
+                self.l1.set(key, value, expires_at - now)
+        return len(entries)
+
+    def __len__(self) -> int:
+        with self._l1_lock:
+            return len(self.l1)
+
+    def close(self):
+        self._flush_hits()
+        self.l2.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._l1_lock:
+            l1_stats = self.l1.get_stats()
+        return {
+            **l1_stats,
+            "backend": self.name,
+            "promotions": self.promotions,
+            "l2": self.l2.get_stats()
+        }
+
+def create_cache_backend(max_size: int, ttl_seconds: float, max_bytes: int = 0) -> CacheBackend:
+    """依設定建立快取後端"""
+    if Config.CACHE_BACKEND == "redis":
+        return RedisCacheBackend()
+    if Config.CACHE_BACKEND == "tiered":
+        return TieredCacheBackend(MemoryCacheBackend(max_size, ttl_seconds, max_bytes), SqliteCacheBackend())
+    return MemoryCacheBackend(max_size, ttl_seconds, max_bytes)
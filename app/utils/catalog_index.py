@@ -0,0 +1,103 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set
+from app.utils.product_matcher import ProductMatcher
+
+class CatalogIndex:
+    """商品目錄的倒排索引：完整詞彙與三字元 n-gram 兩種索引，查詢不需掃描整份目錄
+
+    每筆記錄的名稱先轉為查詢標準形式再建立索引，因此 "RTX4090"、"ＲＴＸ-4090" 等寫法都能互相匹配。
+    查詢詞彙只要是名稱中某個詞彙的一部分即算符合（與逐筆子字串比對的結果相同），短於 n-gram 的詞彙改查詞彙表。
+    記錄另依 partition_field 欄位（例如分類）分區，查詢可限定在單一分區內。
+    """
+
+    NGRAM_SIZE = 3
+
+    def __init__(self, records: List[Dict[str, Any]], partition_field: Optional[str] = None):
+        self.matcher = ProductMatcher()
+        self.records = records
+        self.names: List[str] = []
+        self.token_postings: Dict[str, Set[int]] = defaultdict(set)
+        self.ngram_postings: Dict[str, Set[int]] = defaultdict(set)
+        self.partitions: Dict[str, Set[int]] = defaultdict(set)
+        # 短詞彙（少於 NGRAM_SIZE 個字元）對應的記錄，查詢時才由詞彙表計算
+        self.short_postings: Dict[str, Set[int]] = {}
+
+        for record_id, record in enumerate(records):
+            if partition_field and record.get(partition_field):
+                self.partitions[record[partition_field]].add(record_id)
+            name = self.matcher.canonicalize_query(record["name"])
+            self.names.append(name)
+            for token in name.split():
+                self.token_postings[token].add(record_id)
+                for ngram in self._ngrams(token):
+                    self.ngram_postings[ngram].add(record_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _ngrams(self, token: str) -> Set[str]:
+        size = self.NGRAM_SIZE
+        return {token[i:i + size] for i in range(len(token) - size + 1)}
+
+    def _candidates(self, token: str, within: Optional[Set[int]] = None) -> Set[int]:
+        """包含此詞彙（完整詞彙或詞彙的一部分）的記錄，within 限定候選範圍"""
+        if len(token) < self.NGRAM_SIZE:
+            return self._short_candidates(token, within)
+        exact = self.token_postings.get(token, set())
+        if within is not None:
+            exact = exact & within
+
+        # 取所有 n-gram 的交集後，再確認確實包含此字串（n-gram 交集可能誤判）
+        postings = [self.ngram_postings.get(ngram) for ngram in self._ngrams(token)]
+        if not all(postings):
+            return exact
+        if within is not None:
+            postings.append(within)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return exact | {record_id for record_id in candidates if token in self.names[record_id]}
+
+    def _short_candidates(self, token: str, within: Optional[Set[int]] = None) -> Set[int]:
+        """過短無法使用 n-gram 的詞彙（例如 "16 g" 的 g、"技嘉"）：候選範圍小時直接確認名稱，否則查詢詞彙表"""
+        if within is not None and len(within) <= len(self.token_postings):
+            return {record_id for record_id in within if token in self.names[record_id]}
+        postings = self.short_postings.get(token)
+        if postings is None:
+            postings = set()
+            for vocabulary_token, record_ids in self.token_postings.items():
+                if token in vocabulary_token:
+                    postings |= record_ids
+            self.short_postings[token] = postings
+        return postings & within if within is not None else postings
+
+    def search(self, query: str, limit: int = 0, partition: Optional[str] = None) -> List[Dict[str, Any]]:
+        """回傳名稱包含所有查詢詞彙的記錄（依目錄順序），limit 為 0 時不限制數量，partition 限定分區"""
+        tokens = self.matcher.canonicalize_query(query).split()
+        if not tokens:
+            return []
+
+        matched = None
+        if partition is not None:
+            matched = self.partitions.get(partition)
+            if not matched:
+                return []
+        # 先處理較長的詞彙，候選集合通常較小
+        for token in sorted(set(tokens), key=len, reverse=True):
+            # 先前詞彙的結果作為候選範圍，只需確認範圍內的記錄
+            matched = self._candidates(token, matched)
+            if not matched:
+                return []
+
+        record_ids = sorted(matched)
+        if limit:
+            record_ids = record_ids[:limit]
+        return [self.records[record_id] for record_id in record_ids]
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得索引統計資訊"""
+        return {
+            "records": len(self.records),
+            "tokens": len(self.token_postings),
+            "ngrams": len(self.ngram_postings),
+            "partitions": {partition: len(record_ids) for partition, record_ids in self.partitions.items()}
+        }
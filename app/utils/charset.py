@@ -0,0 +1,67 @@
+import codecs
+import re
+from typing import Optional, Dict, Tuple
+
+# <meta charset="big5"> 或 <meta http-equiv="Content-Type" content="text/html; charset=big5">
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_\-]+)', re.IGNORECASE)
+
+# 沒有任何宣告時依序嘗試的編碼（台灣網站以 UTF-8 與 Big5 為主）
+FALLBACK_ENCODINGS = ('utf-8', 'cp950', 'gb18030')
+
+# Big5 / GB2312 以相容的超集合解碼，避免擴充字元解碼失敗
+ENCODING_ALIASES = {
+    'big5': 'cp950',
+    'big5-tw': 'cp950',
+    'x-big5': 'cp950',
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+}
+
+class CharsetDecoder:
+    """單次解碼網頁內容：依標頭、<meta> 及主機記錄決定編碼"""
+
+    def __init__(self, sniff_bytes: int = 4096):
+        self.sniff_bytes = sniff_bytes
+        self.host_encodings: Dict[str, str] = {}
+
+    def _normalize(self, label: Optional[str]) -> Optional[str]:
+        """將編碼名稱標準化，無法辨識時回傳None"""
+        if not label:
+            return None
+        label = label.strip().strip('"\'').lower()
+        label = ENCODING_ALIASES.get(label, label)
+        try:
+            return codecs.lookup(label).name
+        except LookupError:
+            return None
+
+    def _sniff_meta(self, body: bytes) -> Optional[str]:
+        """從頁面開頭的 <meta> 標籤取得編碼"""
+        match = META_CHARSET_PATTERN.search(body[:self.sniff_bytes])
+        if not match:
+            return None
+        return self._normalize(match.group(1).decode('ascii', errors='ignore'))
+
+    def decode(self, body: bytes, host: str, header_charset: Optional[str] = None) -> Tuple[str, str]:
+        """解碼內容，回傳 (文字, 使用的編碼)"""
+        declared = self._normalize(header_charset) or self._sniff_meta(body)
+
+        # 有宣告時只解碼一次；宣告錯誤或沒有宣告時，先用此主機上次成功的編碼，再依序嘗試
+        known = self.host_encodings.get(host)
+        candidates = []
+        for encoding in (declared, known) + FALLBACK_ENCODINGS:
+            if encoding and encoding not in candidates:
+                candidates.append(encoding)
+
+        for encoding in candidates:
+            try:
+                text = body.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            self.host_encodings[host] = encoding
+            return text, encoding
+
+        return body.decode('utf-8', errors='ignore'), 'utf-8'
+
+# 整個行程共用的解碼器（保存各主機的編碼記錄）
+charset_decoder = CharsetDecoder()
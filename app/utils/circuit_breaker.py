@@ -0,0 +1,83 @@
+import time
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from app.config import Config
+
+class CircuitBreaker:
+    """單一商店的斷路器：連續失敗後暫停呼叫，冷卻後以單一請求試探"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, recovery_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.recovery_seconds = recovery_seconds or Config.CIRCUIT_BREAKER_RECOVERY_SECONDS
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.transitions: List[Dict[str, str]] = []
+
+    def _transition(self, new_state: str):
+        """切換狀態並記錄最近的轉換"""
+        if new_state == self.state:
+            return
+        print(f"斷路器 {self.name}: {self.state} -> {new_state}")
+        self.transitions.append({
+            "from": self.state,
+            "to": new_state,
+            "at": datetime.now().isoformat()
+        })
+        self.transitions = self.transitions[-10:]
+        self.state = new_state
+
+    def allow_request(self) -> bool:
+        """判斷此次是否可以呼叫商店"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_seconds:
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.HALF_OPEN and not self.probe_in_flight:
+            # 半開狀態只放行一個試探請求
+            self.probe_in_flight = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """呼叫成功：重置失敗計數並關閉斷路器"""
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self._transition(self.CLOSED)
+
+    def record_failure(self):
+        """呼叫失敗：達到門檻或試探失敗時開啟斷路器"""
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    def release_probe(self):
+        """呼叫結果無法判斷（例如被取消）時釋放試探名額"""
+        self.probe_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        """取得斷路器狀態"""
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.recovery_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_in_seconds": round(retry_in, 1),
+            "rejected": self.rejected,
+            "transitions": self.transitions
+        }
@@ -0,0 +1,239 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+from urllib.parse import urlencode, urlparse
+from app.config import Config
+
+def make_cache_key(url: str, params: Optional[Dict] = None) -> str:
+    """以URL與查詢參數生成快取鍵值"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+class ValidatorCache:
+    """HTTP驗證器快取（ETag / Last-Modified），用於條件式請求"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_size = max_size if max_size is not None else Config.HTTP_VALIDATOR_CACHE_SIZE
+        self.revalidated = 0
+        self.refreshed = 0
+        self.bytes_saved = 0
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """取得條件式請求所需的標頭"""
+        entry = self.entries.get(key)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_body(self, key: str) -> Optional[str]:
+        """伺服器回應304時取回先前儲存的內容"""
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+
+        self.entries.move_to_end(key)
+        self.revalidated += 1
+        self.bytes_saved += entry["size"]
+        return entry["body"]
+
+    def store(self, key: str, response_headers, body: str):
+        """儲存回應的驗證器與內容（沒有驗證器的回應不快取）"""
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self.entries.pop(key, None)
+            return
+
+        self.entries[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+            "size": len(body.encode("utf-8")),
+            "stored_at": datetime.now()
+        }
+        self.entries.move_to_end(key)
+        self.refreshed += 1
+
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """清空所有驗證器"""
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得驗證器快取統計資訊"""
+        return {
+            "total_items": len(self.entries),
+            "max_size": self.max_size,
+            "revalidated": self.revalidated,
+            "refreshed": self.refreshed,
+            "bytes_saved": self.bytes_saved
+        }
+
+class ResponseCache:
+    """壓縮後存放於本機磁碟的原始回應快取（依主機設定TTL，重啟後仍有效；過期檔案於讀取或定期清理時刪除，總大小有上限）"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or Config.RESPONSE_CACHE_DIR)
+        self.default_ttl = Config.RESPONSE_CACHE_DEFAULT_TTL_SECONDS
+        self.host_ttls = Config.RESPONSE_CACHE_TTLS
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_written = 0
+        self.max_bytes = Config.RESPONSE_CACHE_MAX_BYTES
+        self.sweep_every_writes = Config.RESPONSE_CACHE_SWEEP_EVERY_WRITES
+        self.writes_since_sweep = 0
+        self.expired_deleted = 0
+        self.swept = 0
+
+    def get_ttl(self, url: str) -> int:
+        """取得URL所屬主機的快取秒數"""
+        host = urlparse(url).netloc.lower()
+        return self.host_ttls.get(host, self.default_ttl)
+
+    def _path_for(self, key: str) -> Path:
+        """快取鍵值對應的檔案路徑"""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json.gz"
+
+    def _read(self, key: str, ttl: int) -> Optional[str]:
+        """讀取並解壓縮未過期的快取檔案"""
+        path = self._path_for(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Response cache read failed for {key}: {e}")
+            return None
+
+        if entry.get("key") != key:
+            return None
+        if time.time() - entry.get("stored_at", 0) > ttl:
+            # 過期的檔案直接刪除，不等待清理
+            self._unlink(path)
+            self.expired_deleted += 1
+            return None
+        return entry.get("body")
+
+    def _unlink(self, path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _sweep(self) -> int:
+        """刪除超過最長TTL的檔案（含中斷留下的暫存檔），總大小超過上限時再從最舊的開始刪除，回傳刪除數量"""
+        max_age = max([self.default_ttl, *self.host_ttls.values()])
+        now = time.time()
+        removed = 0
+        files = []
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > max_age:
+                self._unlink(path)
+                removed += 1
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in files)
+        if self.max_bytes and total_bytes > self.max_bytes:
+            files.sort()
+            for _, size, path in files:
+                if total_bytes <= self.max_bytes:
+                    break
+                self._unlink(path)
+                total_bytes -= size
+                removed += 1
+        return removed
+
+    async def sweep(self) -> int:
+        """在背景執行緒清理磁碟快取"""
+        self.writes_since_sweep = 0
+        removed = await asyncio.to_thread(self._sweep)
+        self.swept += removed
+        return removed
+
+    def _write(self, key: str, body: str) -> int:
+        """壓縮並原子性地寫入快取檔案，回傳寫入位元組數"""
+        path = self._path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = gzip.compress(
+            json.dumps({"key": key, "stored_at": time.time(), "body": body}, ensure_ascii=False).encode("utf-8")
+        )
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return len(payload)
+
+    async def get(self, key: str, url: str) -> Optional[str]:
+        """取得快取的回應內容"""
+        ttl = self.get_ttl(url)
+        if ttl <= 0:
+            return None
+
+        body = await asyncio.to_thread(self._read, key, ttl)
+        if body is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.bytes_saved += len(body.encode("utf-8"))
+        return body
+
+    async def set(self, key: str, url: str, body: str):
+        """儲存回應內容"""
+        if self.get_ttl(url) <= 0:
+            return
+
+        try:
+            self.bytes_written += await asyncio.to_thread(self._write, key, body)
+        except OSError as e:
+            print(f"Response cache write failed for {key}: {e}")
+            return
+
+        self.writes_since_sweep += 1
+        if self.sweep_every_writes and self.writes_since_sweep >= self.sweep_every_writes:
+            await self.sweep()
+
+    def clear(self):
+        """清空磁碟快取"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得回應快取統計資訊"""
+        total = self.hits + self.misses
+        return {
+            "cache_dir": str(self.cache_dir),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "bytes_written": self.bytes_written,
+            "max_bytes": self.max_bytes,
+            "expired_deleted": self.expired_deleted,
+            "swept": self.swept
+        }
@@ -0,0 +1,77 @@
+import asyncio
+import random
+from typing import Dict
+from urllib.parse import urlparse
+
+import aiohttp
+
+from app.config import Config
+
+class HttpSessionPool:
+    """依主機分組的長連線HTTP會話池（整個行程共用）"""
+
+    def __init__(self):
+        self.config = Config()
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._lock = asyncio.Lock()
+
+    def _host_key(self, url: str) -> str:
+        """取得URL對應的主機鍵值（scheme://host:port）"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    def _build_session(self) -> aiohttp.ClientSession:
+        """建立單一主機使用的HTTP會話"""
+        headers = {
+            'User-Agent': random.choice(self.config.USER_AGENTS),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-TW,zh;q=0.8,en-US;q=0.5,en;q=0.3',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+
+        timeout = aiohttp.ClientTimeout(total=self.config.TIMEOUT_SECONDS)
+        # 連線保持存活，讓TLS握手與DNS查詢只需付出一次
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.config.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=self.config.HTTP_POOL_KEEPALIVE_SECONDS,
+            ssl=False,  # 暫時禁用SSL驗證以避免連接問題
+            ttl_dns_cache=300,  # DNS快取5分鐘
+            use_dns_cache=True,
+        )
+        return aiohttp.ClientSession(
+            headers=headers,
+            timeout=timeout,
+            connector=connector
+        )
+
+    async def get_session(self, url: str) -> aiohttp.ClientSession:
+        """取得URL所屬主機的共用會話，不存在時建立"""
+        key = self._host_key(url)
+        session = self.sessions.get(key)
+        if session is not None and not session.closed:
+            return session
+
+        async with self._lock:
+            session = self.sessions.get(key)
+            if session is None or session.closed:
+                session = self._build_session()
+                self.sessions[key] = session
+            return session
+
+    async def close(self):
+        """關閉所有會話"""
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得連線池統計資訊"""
+        return {
+            "hosts": len(self.sessions),
+            "limit_per_host": self.config.HTTP_POOL_LIMIT_PER_HOST,
+            "keepalive_seconds": self.config.HTTP_POOL_KEEPALIVE_SECONDS
+        }
@@ -0,0 +1,164 @@
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# 項目大小分布的區間上限（位元組），每格為前一格的 4 倍
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+def _bucket_label(limit: int) -> str:
+    return f"<={limit // 1024}KiB" if limit < 1048576 else f"<={limit // 1048576}MiB"
+
+class LRUTTLCache:
+    """O(1) 存取的 LRU + TTL 快取：OrderedDict 維護使用順序，過期堆積延遲淘汰
+
+    可同時限制項目數（max_size）與總位元組數（max_bytes），0 代表不限制；
+    項目大小由 sizer 計算，未提供時每個項目以 0 位元組計。
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, max_bytes: int = 0, sizer: Optional[Callable[[Any], int]] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self.total_bytes = 0
+        self._size_histogram = [0] * (len(SIZE_BUCKETS) + 1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def _bucket_index(self, size: int) -> int:
+        for index, limit in enumerate(SIZE_BUCKETS):
+            if size <= limit:
+                return index
+        return len(SIZE_BUCKETS)
+
+    def _remove(self, key: Hashable) -> Tuple[Any, float, int]:
+        """移除項目並更新位元組統計"""
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry[2]
+        self._size_histogram[self._bucket_index(entry[2])] -= 1
+        return entry
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """取得資料並更新使用順序，過期或不存在時回傳None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """設定資料，超過容量或位元組上限時淘汰最久未使用的項目"""
+        now = time.monotonic()
+        self._purge_expired(now)
+
+        size = self.sizer(value) if self.sizer else 0
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes and size > self.max_bytes:
+            # 單一項目就超過上限，不快取以免清空整個快取
+            self.rejected += 1
+            return
+
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._entries[key] = (value, expires_at, size)
+        self.total_bytes += size
+        self._size_histogram[self._bucket_index(size)] += 1
+
+        self._sequence += 1
+        heapq.heappush(self._expiry_heap, (expires_at, self._sequence, key))
+
+        while (self.max_size and len(self._entries) > self.max_size) or (self.max_bytes and self.total_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+        # 覆寫或淘汰留下的過時堆積項目過多時重建，維持攤銷 O(1)
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._rebuild_heap()
+
+    def delete(self, key: Hashable) -> bool:
+        """刪除單一項目"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def _purge_expired(self, now: float):
+        """從過期堆積頂端移除已過期的項目（延遲淘汰）"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # 項目可能已被覆寫（過期時間不同）或已被淘汰
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+    def _rebuild_heap(self):
+        """依現存項目重建過期堆積"""
+        self._expiry_heap = []
+        for key, (_, expires_at, _) in self._entries.items():
+            self._sequence += 1
+            self._expiry_heap.append((expires_at, self._sequence, key))
+        heapq.heapify(self._expiry_heap)
+
+    def purge_expired(self):
+        """主動清理所有已過期的項目"""
+        self._purge_expired(time.monotonic())
+
+    def clear(self):
+        """清空所有項目"""
+        self._entries.clear()
+        self._expiry_heap.clear()
+        self.total_bytes = 0
+        self._size_histogram = [0] * (len(SIZE_BUCKETS) + 1)
+
+    def get_size_stats(self) -> Dict[str, Any]:
+        """取得項目大小分布"""
+        labels = [_bucket_label(limit) for limit in SIZE_BUCKETS] + [f">{SIZE_BUCKETS[-1] // 1048576}MiB"]
+        count = len(self._entries)
+        return {
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "avg_entry_bytes": self.total_bytes // count if count else 0,
+            "largest_entry_bytes": max((entry[2] for entry in self._entries.values()), default=0),
+            "size_histogram": dict(zip(labels, self._size_histogram))
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得快取統計資訊"""
+        total = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+        if self.sizer:
+            stats["rejected"] = self.rejected
+            stats.update(self.get_size_stats())
+        return stats
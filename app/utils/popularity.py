@@ -0,0 +1,84 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+class PopularityTracker:
+    """熱門查詢統計（Space-Saving 演算法）：固定記憶體內估算出現次數最多的查詢
+
+    表格滿時新查詢取代次數最少的項目並繼承其次數，估計值只會偏高，誤差記錄於 error。
+    每經過一個半衰期所有次數減半，讓排名反映近期流量；減半後低於 min_count 的項目直接移除。
+    """
+
+    def __init__(self, capacity: int, half_life_seconds: float, min_count: float = 0):
+        self.capacity = capacity
+        self.half_life_seconds = half_life_seconds
+        self.min_count = min_count
+        self.counters: Dict[str, Dict[str, Any]] = {}
+        self.last_decay = time.monotonic()
+        self.total = 0
+        self.replacements = 0
+        self.pruned = 0
+
+    def _decay(self, now: float):
+        """依經過的半衰期數量將所有次數減半，並移除已冷卻的查詢"""
+        if self.half_life_seconds <= 0:
+            return
+        periods = int((now - self.last_decay) // self.half_life_seconds)
+        if periods <= 0:
+            return
+        factor = 0.5 ** periods
+        for counter in self.counters.values():
+            counter["count"] *= factor
+            counter["error"] *= factor
+        self.last_decay += periods * self.half_life_seconds
+
+        if self.min_count > 0:
+            cooled = [key for key, counter in self.counters.items() if counter["count"] < self.min_count]
+            for key in cooled:
+                del self.counters[key]
+            self.pruned += len(cooled)
+
+    def record(self, key: str, query: str):
+        """記錄一次查詢；key 為標準形式，query 保留使用者輸入供背景爬取使用"""
+        self._decay(time.monotonic())
+        self.total += 1
+
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter["count"] += 1
+            counter["query"] = query
+            return
+
+        if len(self.counters) < self.capacity:
+            self.counters[key] = {"count": 1, "error": 0, "query": query}
+            return
+
+        # 表格已滿：取代次數最少的項目
+        min_key = min(self.counters, key=lambda k: self.counters[k]["count"])
+        min_count = self.counters.pop(min_key)["count"]
+        self.counters[key] = {"count": min_count + 1, "error": min_count, "query": query}
+        self.replacements += 1
+
+    def top(self, n: int, min_count: float = 0) -> List[Tuple[str, str, float]]:
+        """取得前 n 個熱門查詢 (標準形式, 使用者輸入, 估計次數)，只保留保證次數（count - error）達 min_count 者"""
+        self._decay(time.monotonic())
+        ranked = sorted(
+            (item for item in self.counters.items() if item[1]["count"] - item[1]["error"] >= min_count),
+            key=lambda item: item[1]["count"],
+            reverse=True
+        )
+        return [(key, counter["query"], counter["count"]) for key, counter in ranked[:n]]
+
+    def get_stats(self, n: int = 10) -> Dict[str, Any]:
+        """取得統計資訊與前 n 個熱門查詢"""
+        return {
+            "tracked": len(self.counters),
+            "capacity": self.capacity,
+            "total": self.total,
+            "replacements": self.replacements,
+            "min_count": self.min_count,
+            "pruned": self.pruned,
+            "top": [
+                {"query": key, "count": round(count, 1)}
+                for key, _, count in self.top(n)
+            ]
+        }
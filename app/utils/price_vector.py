@@ -0,0 +1,73 @@
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+class PriceVector:
+    """以選項值排序的價格向量（int64 選項值 + float64 價格），兩份快照可整批比對"""
+
+    def __init__(self, option_values: np.ndarray, prices: np.ndarray):
+        order = np.argsort(option_values, kind="stable")
+        option_values = option_values[order]
+        # 同一選項值出現多次時只保留第一筆
+        keep = np.ones(len(option_values), dtype=bool)
+        keep[1:] = option_values[1:] != option_values[:-1]
+        self.option_values = option_values[keep]
+        self.prices = prices[order][keep]
+        # 每個選項值在原始記錄中的位置，用於取回商品名稱
+        self.positions = order[keep]
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "PriceVector":
+        """由商品記錄（option_value、price）建立價格向量"""
+        option_values = np.fromiter((int(record["option_value"]) for record in records), dtype=np.int64, count=len(records))
+        prices = np.fromiter((record["price"] for record in records), dtype=np.float64, count=len(records))
+        return cls(option_values, prices)
+
+    def __len__(self) -> int:
+        return len(self.option_values)
+
+    def diff(self, previous: "PriceVector") -> Dict[str, np.ndarray]:
+        """與前一份快照比對，回傳價格變動、新增與移除的選項值（皆為向量運算）"""
+        common, current_index, previous_index = np.intersect1d(
+            self.option_values, previous.option_values, assume_unique=True, return_indices=True
+        )
+        new_prices = self.prices[current_index]
+        old_prices = previous.prices[previous_index]
+        changed = new_prices != old_prices
+        return {
+            "changed": common[changed],
+            "old_prices": old_prices[changed],
+            "new_prices": new_prices[changed],
+            "added": np.setdiff1d(self.option_values, previous.option_values, assume_unique=True),
+            "removed": np.setdiff1d(previous.option_values, self.option_values, assume_unique=True)
+        }
+
+    def lookup(self, option_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """查詢多個選項值的價格與原始記錄位置（選項值必須存在）"""
+        index = np.searchsorted(self.option_values, option_values)
+        return self.prices[index], self.positions[index]
+
+def price_events(
+    diff: Dict[str, np.ndarray],
+    current: PriceVector,
+    previous: PriceVector,
+    current_records: List[Dict[str, Any]],
+    previous_records: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """將比對結果轉為精簡的事件串流（changed / added / removed），只有變動的項目才會建立字典"""
+    events = []
+    _, positions = current.lookup(diff["changed"])
+    for option_value, old_price, new_price, position in zip(
+        diff["changed"].tolist(), diff["old_prices"].tolist(), diff["new_prices"].tolist(), positions.tolist()
+    ):
+        events.append({
+            "event": "changed",
+            "option_value": option_value,
+            "name": current_records[position]["name"],
+            "old_price": old_price,
+            "new_price": new_price
+        })
+    for event, vector, records in (("added", current, current_records), ("removed", previous, previous_records)):
+        prices, positions = vector.lookup(diff[event])
+        for option_value, price, position in zip(diff[event].tolist(), prices.tolist(), positions.tolist()):
+            events.append({"event": event, "option_value": option_value, "name": records[position]["name"], "price": price})
+    return events
@@ -1,11 +1,33 @@
 import re
-from typing import List, Dict, Any
-from difflib import SequenceMatcher
+import unicodedata
+from typing import List, Dict, Any, Optional
+from app.utils.similarity import create_similarity_kernel
+
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s\-]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NUMBER_PATTERN = re.compile(r'\d+')
+MODEL_PATTERN = re.compile(r'(rtx|gtx|rx|i\d|ryzen)\s*\d+[a-z]*', re.IGNORECASE)
+
+# 商品分類與其查詢特徵
+CATEGORY_PATTERNS = {
+    'cpu': r'\b(ryzen|xeon|threadripper|core ultra|i [3579] \d{4,5}|x 3 d)\b|處理器',
+    'motherboard': r'\b[abhxz] \d{3}\b|主機板|主板',
+    'ram': r'\bddr \d\b|記憶體',
+    'vga': r'\b(rtx|gtx|geforce|radeon|rx \d{3,4})\b|顯示卡|顯卡',
+    'ssd': r'\b(ssd|nvme|m 2)\b|固態',
+    'hdd': r'\bhdd\b|傳統硬碟',
+    'psu': r'\bpsu\b|\b\d{3,4} w\b|電源供應器',
+    'case': r'機殼',
+    'cooler': r'散熱器|水冷|塔扇',
+    'monitor': r'\bmonitor\b|螢幕|顯示器'
+}
+# 商店有提供分類、但不屬於上述任何分類的商品（例如周邊配件），指定分類篩選時一律排除
+OTHER_CATEGORY = 'other'
 
 class ProductMatcher:
     """產品匹配工具類"""
     
-    def __init__(self):
+    def __init__(self, similarity_kernel: Optional[str] = None):
         # 常見品牌和型號的同義詞映射
         self.brand_synonyms = {
             'nvidia': ['nvidia', 'geforce', 'gtx', 'rtx'],
@@ -29,6 +51,18 @@ class ProductMatcher:
             'cores': r'(\d+)核心?',
             'model_number': r'[A-Z]+\d+[A-Z]*'
         }
+        
+        self.compiled_spec_patterns = {
+            spec_type: re.compile(pattern, re.IGNORECASE) for spec_type, pattern in self.spec_patterns.items()
+        }
+        
+        # 基本相似度的演算法（預設依設定）
+        self.similarity_kernel = create_similarity_kernel(similarity_kernel)
+        
+        # 商品分類的查詢特徵（比對查詢標準形式，例如 "i 9 13900 k"、"b 650"）
+        self.category_patterns = {
+            category: re.compile(pattern) for category, pattern in CATEGORY_PATTERNS.items()
+        }
     
     def normalize_search_term(self, term: str) -> str:
         """標準化搜尋詞彙"""
@@ -36,15 +70,45 @@ class ProductMatcher:
             return ""
         
         # 轉為小寫並移除特殊字符
-        normalized = re.sub(r'[^\w\s\-]', ' ', term.lower())
+        normalized = SPECIAL_CHAR_PATTERN.sub(' ', term.lower())
         
         # 移除多餘空格
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = WHITESPACE_PATTERN.sub(' ', normalized).strip()
         
         return normalized
     
+    def canonicalize_query(self, term: str) -> str:
+        """查詢的標準形式：同義的寫法（全形、大小寫、連字號、空格）得到相同結果，用於快取鍵值與記錄"""
+        if not term:
+            return ""
+        
+        # 全形轉半形（ＲＴＸ　４０９０ -> RTX 4090）
+        normalized = unicodedata.normalize('NFKC', term)
+        normalized = self.normalize_search_term(normalized)
+        
+        # 連字號與底線視為空格（RTX-4090 -> rtx 4090）
+        normalized = re.sub(r'[\-_]+', ' ', normalized)
+        
+        # 中文與英文字母、數字之間補空格（技嘉b650m -> 技嘉 b650m）
+        normalized = re.sub(r'(?<=[\u4e00-\u9fff])(?=[a-z\d])|(?<=[a-z\d])(?=[\u4e00-\u9fff])', ' ', normalized)
+        
+        # 英文字母與數字之間補空格（rtx4090 -> rtx 4090）
+        normalized = re.sub(r'(?<=[a-z])(?=\d)|(?<=\d)(?=[a-z])', ' ', normalized)
+        
+        return re.sub(r'\s+', ' ', normalized).strip()
+    
+    def guess_category(self, term: str) -> Optional[str]:
+        """由查詢推測商品分類（例如 RTX -> vga），符合多個分類或都不符合時回傳None"""
+        canonical = self.canonicalize_query(term)
+        matched = [category for category, pattern in self.category_patterns.items() if pattern.search(canonical)]
+        return matched[0] if len(matched) == 1 else None
+    
     def extract_key_features(self, product_name: str) -> Dict[str, Any]:
         """提取產品關鍵特徵"""
+        return self._extract_features(self.normalize_search_term(product_name))
+    
+    def _extract_features(self, normalized_name: str) -> Dict[str, Any]:
+        """由已標準化的名稱提取關鍵特徵"""
         features = {
             'brand': None,
             'model': None,
@@ -53,8 +117,6 @@ class ProductMatcher:
             'specs': []
         }
         
-        normalized_name = self.normalize_search_term(product_name)
-        
         # 提取品牌
         for brand, synonyms in self.brand_synonyms.items():
             for synonym in synonyms:
@@ -65,84 +127,27 @@ class ProductMatcher:
                 break
         
         # 提取型號和規格
-        for spec_type, pattern in self.spec_patterns.items():
-            matches = re.findall(pattern, normalized_name, re.IGNORECASE)
+        for spec_type, pattern in self.compiled_spec_patterns.items():
+            matches = pattern.findall(normalized_name)
             if matches:
                 if spec_type in ['memory', 'storage']:
                     features[spec_type] = matches[0] if isinstance(matches[0], str) else matches[0][0]
                 features['specs'].extend(matches)
         
         # 提取型號（如RTX 4090, i9-13900K等）
-        model_match = re.search(r'(rtx|gtx|rx|i\d|ryzen)\s*\d+[a-z]*', normalized_name, re.IGNORECASE)
+        model_match = MODEL_PATTERN.search(normalized_name)
         if model_match:
             features['model'] = model_match.group(0).upper().replace(' ', '')
         
         return features
     
+    def compile_query(self, search_term: str) -> 'CompiledQuery':
+        """建立查詢計畫，同一次搜尋的所有產品共用"""
+        return CompiledQuery(self, search_term)
+    
     def calculate_similarity(self, search_term: str, product_name: str) -> float:
         """計算搜尋詞與產品名稱的相似度"""
-        search_normalized = self.normalize_search_term(search_term)
-        product_normalized = self.normalize_search_term(product_name)
-        
-        # 檢查是否有直接的子字符串匹配 - 這很重要！
-        direct_match_score = 0
-        if search_normalized in product_normalized:
-            # 根據搜尋詞在產品名稱中的相對長度給分
-            match_ratio = len(search_normalized) / len(product_normalized)
-            direct_match_score = 0.3 + (match_ratio * 0.4)  # 基礎0.3分，最高0.7分
-        
-        # 使用SequenceMatcher計算基本相似度
-        basic_similarity = SequenceMatcher(None, search_normalized, product_normalized).ratio()
-        
-        # 提取關鍵特徵進行比較
-        search_features = self.extract_key_features(search_term)
-        product_features = self.extract_key_features(product_name)
-        
-        # 計算特徵匹配度
-        feature_score = 0
-        total_features = 0
-        
-        # 品牌匹配
-        if search_features['brand'] and product_features['brand']:
-            total_features += 1
-            if search_features['brand'] == product_features['brand']:
-                feature_score += 1
-        
-        # 型號匹配 - 這是最重要的匹配，給予更高權重
-        if search_features['model'] and product_features['model']:
-            total_features += 2  # 型號匹配權重加倍
-            if search_features['model'] == product_features['model']:
-                feature_score += 2  # 完全匹配給2分
-            elif search_features['model'][:3] == product_features['model'][:3]:
-                feature_score += 0.5  # 部分匹配給0.5分
-        
-        # 數字匹配 - 對於純數字搜尋（如5080）特別重要
-        search_numbers = re.findall(r'\d+', search_normalized)
-        product_numbers = re.findall(r'\d+', product_normalized)
-        if search_numbers and product_numbers:
-            total_features += 1
-            # 檢查搜尋的數字是否出現在產品中
-            number_matches = sum(1 for num in search_numbers if num in product_numbers)
-            if number_matches > 0:
-                feature_score += number_matches / len(search_numbers)
-        
-        # 規格匹配
-        if search_features['specs'] and product_features['specs']:
-            total_features += 1
-            common_specs = set(search_features['specs']) & set(product_features['specs'])
-            if common_specs:
-                feature_score += len(common_specs) / max(len(search_features['specs']), len(product_features['specs']))
-        
-        # 綜合評分
-        if total_features > 0:
-            feature_similarity = feature_score / total_features
-            # 加權平均：直接匹配30%，基本相似度20%，特徵相似度50%
-            final_score = direct_match_score * 0.3 + basic_similarity * 0.2 + feature_similarity * 0.5
-        else:
-            # 如果沒有特徵匹配，但有直接匹配，仍給較高分數
-            final_score = max(direct_match_score, basic_similarity)
-        
-        return min(final_score, 1.0)
+        return self.compile_query(search_term).score(product_name)
     
     def is_relevant_product(self, search_term: str, product_name: str, threshold: float = 0.3) -> bool:
         """判斷產品是否與搜尋詞相關"""
@@ -198,12 +203,14 @@ class ProductMatcher:
     def filter_relevant_products(self, search_term: str, products: List[Dict[str, Any]], threshold: float = 0.3, standalone_only: bool = False) -> List[Dict[str, Any]]:
         """過濾相關產品"""
         relevant_products = []
+        query = self.compile_query(search_term)
         
         for product in products:
             product_name = product.get('product_name', '')
             
-            # 相關性檢查
-            if not self.is_relevant_product(search_term, product_name, threshold):
+            # 相關性檢查（每個產品只計算一次分數）
+            similarity = query.score(product_name)
+            if similarity < threshold:
                 continue
             
             # 單獨商品檢查
@@ -216,10 +223,89 @@ class ProductMatcher:
                     continue
             
             # 添加相似度分數
-            product['similarity_score'] = self.calculate_similarity(search_term, product_name)
+            product['similarity_score'] = similarity
             relevant_products.append(product)
         
         # 按相似度排序
         relevant_products.sort(key=lambda x: x.get('similarity_score', 0), reverse=True)
         
-        return relevant_products 
\ No newline at end of file
+        return relevant_products
+
+
+class CompiledQuery:
+    """單次搜尋的查詢計畫：搜尋詞的標準形式、特徵與數字只計算一次，每個產品只需處理產品名稱"""
+    
+    def __init__(self, matcher: ProductMatcher, search_term: str):
+        self.matcher = matcher
+        self.search_term = search_term
+        self.normalized = matcher.normalize_search_term(search_term)
+        self.features = matcher._extract_features(self.normalized)
+        self.numbers = NUMBER_PATTERN.findall(self.normalized)
+        self.specs = set(self.features['specs'])
+        self.similarity = matcher.similarity_kernel.compile(self.normalized)
+    
+    def score(self, product_name: str) -> float:
+        """計算產品名稱與搜尋詞的相似度"""
+        search_normalized = self.normalized
+        product_normalized = self.matcher.normalize_search_term(product_name)
+        
+        # 檢查是否有直接的子字符串匹配 - 這很重要！
+        direct_match_score = 0
+        if search_normalized in product_normalized:
+            # 根據搜尋詞在產品名稱中的相對長度給分
+            match_ratio = len(search_normalized) / len(product_normalized)
+            direct_match_score = 0.3 + (match_ratio * 0.4)  # 基礎0.3分，最高0.7分
+        
+        # 計算基本相似度（演算法可於設定中選擇）
+        basic_similarity = self.similarity(product_normalized)
+        
+        # 提取關鍵特徵進行比較
+        search_features = self.features
+        product_features = self.matcher._extract_features(product_normalized)
+        
+        # 計算特徵匹配度
+        feature_score = 0
+        total_features = 0
+        
+        # 品牌匹配
+        if search_features['brand'] and product_features['brand']:
+            total_features += 1
+            if search_features['brand'] == product_features['brand']:
+                feature_score += 1
+        
+        # 型號匹配 - 這是最重要的匹配，給予更高權重
+        if search_features['model'] and product_features['model']:
+            total_features += 2  # 型號匹配權重加倍
+            if search_features['model'] == product_features['model']:
+                feature_score += 2  # 完全匹配給2分
+            elif search_features['model'][:3] == product_features['model'][:3]:
+                feature_score += 0.5  # 部分匹配給0.5分
+        
+        # 數字匹配 - 對於純數字搜尋（如5080）特別重要
+        search_numbers = self.numbers
+        if search_numbers:
+            product_numbers = NUMBER_PATTERN.findall(product_normalized)
+            if product_numbers:
+                total_features += 1
+                # 檢查搜尋的數字是否出現在產品中
+                number_matches = sum(1 for num in search_numbers if num in product_numbers)
+                if number_matches > 0:
+                    feature_score += number_matches / len(search_numbers)
+        
+        # 規格匹配
+        if self.specs and product_features['specs']:
+            total_features += 1
+            common_specs = self.specs & set(product_features['specs'])
+            if common_specs:
+                feature_score += len(common_specs) / max(len(search_features['specs']), len(product_features['specs']))
+        
+        # 綜合評分
+        if total_features > 0:
+            feature_similarity = feature_score / total_features
+            # 加權平均：直接匹配30%，基本相似度20%，特徵相似度50%
+            final_score = direct_match_score * 0.3 + basic_similarity * 0.2 + feature_similarity * 0.5
+        else:
+            # 如果沒有特徵匹配，但有直接匹配，仍給較高分數
+            final_score = max(direct_match_score, basic_similarity)
+        
+        return min(final_score, 1.0)
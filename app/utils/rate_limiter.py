@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlparse
+from app.config import Config
+
+# 優先權通道：數字越小越優先
+PRIORITY_INTERACTIVE = 0   # 使用者即時搜尋
+PRIORITY_BACKGROUND = 10   # 背景預熱、定時更新
+
+class HostRateLimiter:
+    """單一主機的令牌桶限速與並行上限（依優先權排隊）"""
+
+    def __init__(self, rate: float, burst: int, concurrency: int):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        """依經過時間補充令牌"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def _acquire_slot(self, priority: int):
+        """取得並行名額，名額不足時依優先權排隊"""
+        if self.active < self.concurrency:
+            self.active += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 名額已轉交但任務被取消時，必須歸還名額
+            if future.done() and not future.cancelled():
+                self._release_slot()
+            raise
+
+    def _release_slot(self):
+        """歸還並行名額，優先轉交給最高優先權的等待者"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    async def _take_token(self):
+        """取得一個令牌，不足時等待補充"""
+        while True:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE):
+        """取得發送請求的許可"""
+        started_at = time.monotonic()
+        await self._acquire_slot(priority)
+        try:
+            await self._take_token()
+        except BaseException:
+            self._release_slot()
+            raise
+        self.acquired += 1
+        self.waited_seconds += time.monotonic() - started_at
+
+    def release(self):
+        """請求完成後歸還名額"""
+        self._release_slot()
+
+    def pause(self, seconds: float):
+        """主機要求降速（429/503）時暫停發送"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得限速器統計資訊"""
+        self._refill()
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "tokens": round(self.tokens, 2),
+            "acquired": self.acquired,
+            "avg_wait_ms": round(self.waited_seconds / self.acquired * 1000, 1) if self.acquired else 0.0
+        }
+
+class RateLimiter:
+    """依主機分組的限速器註冊表（整個行程共用）"""
+
+    def __init__(self):
+        self.limiters: Dict[str, HostRateLimiter] = {}
+
+    def _get_limiter(self, url: str) -> HostRateLimiter:
+        """取得URL所屬主機的限速器，不存在時依設定建立"""
+        host = urlparse(url).netloc.lower()
+        limiter = self.limiters.get(host)
+        if limiter is None:
+            settings = {**Config.RATE_LIMIT_DEFAULTS, **Config.HOST_RATE_LIMITS.get(host, {})}
+            limiter = HostRateLimiter(settings["rate"], settings["burst"], settings["concurrency"])
+            self.limiters[host] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def limit(self, url: str, priority: int = PRIORITY_INTERACTIVE):
+        """在限速範圍內執行一次請求"""
+        limiter = self._get_limiter(url)
+        await limiter.acquire(priority)
+        try:
+            yield limiter
+        finally:
+            limiter.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得所有主機的限速統計"""
+        return {host: limiter.get_stats() for host, limiter in self.limiters.items()}
@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional
+from app.models.product import Product
+
+# 欄位式索引保存的欄位（篩選與排序只讀取這些欄位，不需建立 Product 物件）
+INDEX_COLUMNS = ("price", "in_stock", "is_bundle", "name", "store", "score", "category")
+
+def encode_products(products: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """將產品編碼為預先序列化的JSON列與欄位式索引（寫入快取時只驗證一次）"""
+    columns: Dict[str, List[Any]] = {"rows": []}
+    for column in INDEX_COLUMNS:
+        columns[column] = []
+
+    for product_dict in products:
+        try:
+            product = Product(**product_dict)
+        except Exception as e:
+            print(f"Error creating product object: {e}")
+            continue
+        columns["rows"].append(product.model_dump_json())
+        columns["price"].append(product.price)
+        columns["in_stock"].append(product.in_stock)
+        columns["is_bundle"].append(product.is_bundle)
+        columns["name"].append(product.product_name.lower())
+        columns["store"].append(product.store)
+        columns["score"].append(product.similarity_score or 0)
+        columns["category"].append(product.category)
+    return columns
+
+class ResultIndex:
+    """合併多個商店的欄位式索引，依條件篩選與排序後回傳預先序列化的JSON列"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.rows: List[str] = []
+        self.columns: Dict[str, List[Any]] = {column: [] for column in INDEX_COLUMNS}
+        for entry in entries:
+            self.rows.extend(entry["rows"])
+            for column in INDEX_COLUMNS:
+                self.columns[column].extend(entry[column])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def select(
+        self,
+        sort_by: str,
+        order: str,
+        in_stock_only: bool = False,
+        standalone_only: bool = False,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        category: Optional[str] = None
+    ) -> List[str]:
+        """應用篩選和排序，回傳符合條件的JSON列"""
+        price = self.columns["price"]
+        in_stock = self.columns["in_stock"]
+        is_bundle = self.columns["is_bundle"]
+        score = self.columns["score"]
+
+        # 合併後先依相似度排序，作為其他排序方式的穩定基準
+        indices = sorted(range(len(self.rows)), key=lambda i: score[i], reverse=True)
+
+        # 單獨商品篩選（排除組合/專案商品）
+        if standalone_only:
+            indices = [i for i in indices if not is_bundle[i]]
+        # 庫存篩選
+        if in_stock_only:
+            indices = [i for i in indices if in_stock[i]]
+        # 價格篩選
+        if min_price is not None:
+            indices = [i for i in indices if price[i] >= min_price]
+        if max_price is not None:
+            indices = [i for i in indices if price[i] <= max_price]
+        # 分類篩選（商店未提供分類、值為None的商品保留；其他分類包含 other 皆排除）
+        if category is not None:
+            categories = self.columns["category"]
+            indices = [i for i in indices if categories[i] is None or categories[i] == category]
+
+        # 排序
+        reverse = (order.lower() == "desc")
+        if sort_by in ("price", "name", "store"):
+            column = self.columns[sort_by]
+            indices.sort(key=lambda i: column[i], reverse=reverse)
+
+        return [self.rows[i] for i in indices]
@@ -0,0 +1,122 @@
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Optional, Set, Tuple
+from app.config import Config
+
+def _char_masks(text: str) -> Dict[str, int]:
+    """每個字元在字串中出現位置的位元遮罩"""
+    masks: Dict[str, int] = {}
+    for position, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+def _lcs_length(masks: Dict[str, int], length: int, text: str) -> int:
+    """位元平行最長共同子序列長度（Hyyrö），每個字元只需常數次整數運算"""
+    if not length:
+        return 0
+    full = (1 << length) - 1
+    row = full
+    for char in text:
+        matches = row & masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & full
+    return length - bin(row).count("1")
+
+class SimilarityKernel:
+    """相似度演算法：compile() 對搜尋詞預先計算一次，回傳對產品名稱計算 0~1 分數的函式"""
+
+    name = ""
+
+    def compile(self, query: str) -> Callable[[str], float]:
+        raise NotImplementedError
+
+class SequenceMatcherKernel(SimilarityKernel):
+    """difflib.SequenceMatcher 的 ratio()（原本的演算法，字串長時接近平方時間）"""
+
+    name = "sequence"
+
+    def compile(self, query: str) -> Callable[[str], float]:
+        return lambda text: SequenceMatcher(None, query, text).ratio()
+
+class IndelKernel(SimilarityKernel):
+    """以位元平行 LCS 計算的插入/刪除編輯距離比例 2*LCS/(len(a)+len(b))，與 SequenceMatcher 的 2*M/T 同尺度"""
+
+    name = "indel"
+
+    def compile(self, query: str) -> Callable[[str], float]:
+        masks = _char_masks(query)
+        length = len(query)
+
+        def score(text: str) -> float:
+            total = length + len(text)
+            if not total:
+                return 1.0
+            return 2 * _lcs_length(masks, length, text) / total
+        return score
+
+class TokenSetKernel(SimilarityKernel):
+    """詞彙集合比例：共同詞彙與各自剩餘詞彙組合後取最高的 indel 比例，不受詞序與重複詞彙影響"""
+
+    name = "token_set"
+
+    def compile(self, query: str) -> Callable[[str], float]:
+        query_tokens = set(query.split())
+        indel = IndelKernel()
+        # 搜尋詞端的組合字串只取決於共同詞彙（搜尋詞的子集合），依共同詞彙快取位元遮罩與包含比例，不必每個產品重新計算
+        query_sides: Dict[str, Tuple] = {}
+
+        def query_side(shared: Set[str]) -> Tuple:
+            """(共同詞彙字串, 搜尋詞組合字串的評分函式, 共同詞彙的評分函式, 共同詞彙對搜尋詞的包含比例)"""
+            common = " ".join(sorted(shared))
+            side = query_sides.get(common)
+            if side is None:
+                query_combined = f"{common} {' '.join(sorted(query_tokens - shared))}".strip()
+                common_score = indel.compile(common) if common else None
+                # 一方的詞彙完全包含於另一方時視為完全相符
+                query_ratio = common_score(query_combined) if common_score else 0.0
+                side = query_sides[common] = (common, indel.compile(query_combined), common_score, query_ratio)
+            return side
+
+        def score(text: str) -> float:
+            text_tokens = set(text.split())
+            shared = query_tokens & text_tokens
+            common, query_score, common_score, query_ratio = query_side(shared)
+            text_combined = f"{common} {' '.join(sorted(text_tokens - shared))}".strip()
+            ratio = query_score(text_combined)
+            if common_score is not None:
+                ratio = max(ratio, query_ratio, common_score(text_combined))
+            return ratio
+        return score
+
+class NgramJaccardKernel(SimilarityKernel):
+    """字元 n-gram 集合的 Jaccard 係數，線性時間"""
+
+    name = "ngram"
+    NGRAM_SIZE = 3
+
+    def _ngrams(self, text: str) -> Set[str]:
+        size = self.NGRAM_SIZE
+        if len(text) < size:
+            return {text} if text else set()
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def compile(self, query: str) -> Callable[[str], float]:
+        query_ngrams = self._ngrams(query)
+
+        def score(text: str) -> float:
+            text_ngrams = self._ngrams(text)
+            if not query_ngrams and not text_ngrams:
+                return 1.0
+            common = len(query_ngrams & text_ngrams)
+            return common / (len(query_ngrams) + len(text_ngrams) - common)
+        return score
+
+SIMILARITY_KERNELS = {
+    kernel.name: kernel for kernel in (SequenceMatcherKernel, IndelKernel, TokenSetKernel, NgramJaccardKernel)
+}
+
+def create_similarity_kernel(name: Optional[str] = None) -> SimilarityKernel:
+    """依名稱（預設為設定值）建立相似度演算法，未知名稱時拋出 ValueError"""
+    kernel_name = name or Config.SIMILARITY_KERNEL
+    kernel_class = SIMILARITY_KERNELS.get(kernel_name)
+    if kernel_class is None:
+        raise ValueError(f"未知的相似度演算法 {kernel_name!r}，可用: {', '.join(SIMILARITY_KERNELS)}")
+    return kernel_class()
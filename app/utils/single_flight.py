@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+    """合併相同鍵值的並行請求：同一時間只執行一次，其餘呼叫共用結果"""
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """執行 func，若相同鍵值已在進行中則等待其結果"""
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done_task: self._forget(key, done_task))
+            self.executed += 1
+
+        # shield：發起者被取消時不影響其他等待同一結果的呼叫
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        """任務完成後移除記錄"""
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # 避免未取用的例外產生警告
+
+    def get_stats(self) -> Dict[str, int]:
+        """取得合併統計資訊"""
+        return {
+            "in_flight": len(self.in_flight),
+            "executed": self.executed,
+            "coalesced": self.coalesced
+        }
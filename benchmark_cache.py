@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""快取引擎效能測試：比較舊版線性掃描與 LRU + TTL 快取在不同容量下的每次操作成本"""
+
+import hashlib
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.lru_cache import LRUTTLCache
+
+class LegacyCacheManager:
+    """舊版 CacheManager 的演算法（每次存取都完整掃描，用於對照）"""
+
+    def __init__(self, max_size: int, expire_minutes: int = 30):
+        self.cache = {}
+        self.max_size = max_size
+        self.expire_minutes = expire_minutes
+
+    def _generate_key(self, product_name: str) -> str:
+        return hashlib.md5(product_name.lower().encode()).hexdigest()
+
+    def _cleanup_expired(self):
+        now = datetime.now()
+        expired_keys = [key for key, entry in self.cache.items() if now > entry["expires_at"]]
+        for key in expired_keys:
+            del self.cache[key]
+
+    def _manage_size(self):
+        if len(self.cache) >= self.max_size:
+            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k]["created_at"])
+            del self.cache[oldest_key]
+
+    def get(self, product_name: str):
+        self._cleanup_expired()
+        entry = self.cache.get(self._generate_key(product_name))
+        return entry["data"] if entry else None
+
+    def set(self, product_name: str, data):
+        self._cleanup_expired()
+        self._manage_size()
+        now = datetime.now()
+        self.cache[self._generate_key(product_name)] = {
+            "data": data,
+            "created_at": now,
+            "expires_at": now + timedelta(minutes=self.expire_minutes)
+        }
+
+    def prefill(self, count: int):
+        """直接填入資料（逐筆 set 本身就是 O(n²)，不列入量測）"""
+        now = datetime.now()
+        expires_at = now + timedelta(minutes=self.expire_minutes)
+        for i in range(count):
+            self.cache[self._generate_key(f"product-{i}")] = {
+                "data": {"i": i},
+                "created_at": now + timedelta(microseconds=i),
+                "expires_at": expires_at
+            }
+
+class LRUCacheAdapter:
+    """以與舊版相同的介面包裝 LRUTTLCache"""
+
+    def __init__(self, max_size: int, expire_minutes: int = 30):
+        self.cache = LRUTTLCache(max_size, expire_minutes * 60)
+
+    def _generate_key(self, product_name: str) -> str:
+        return hashlib.md5(product_name.lower().encode()).hexdigest()
+
+    def get(self, product_name: str):
+        return self.cache.get(self._generate_key(product_name))
+
+    def set(self, product_name: str, data):
+        self.cache.set(self._generate_key(product_name), data)
+
+    def prefill(self, count: int):
+        for i in range(count):
+            self.set(f"product-{i}", {"i": i})
+
+def measure(cache_class, size: int, operations: int) -> float:
+    """填滿快取後量測 get/set 混合操作的平均微秒數"""
+    cache = cache_class(max_size=size)
+    cache.prefill(size)
+
+    started_at = time.perf_counter()
+    for i in range(operations):
+        if i % 2:
+            cache.get(f"product-{(i * 7919) % size}")
+        else:
+            cache.set(f"new-product-{i}", {"i": i})  # 容量已滿，每次都會淘汰
+    elapsed = time.perf_counter() - started_at
+    return elapsed / operations * 1_000_000
+
+def main():
+    sizes = [1_000, 10_000, 100_000]
+    print(f"{'容量':>10} | {'舊版 (µs/op)':>14} | {'LRU+TTL (µs/op)':>16}")
+    print("-" * 48)
+    for size in sizes:
+        # 舊版每次操作 O(n)，容量大時減少操作次數以免等待太久
+        legacy_ops = max(20, 200_000 // size)
+        legacy = measure(LegacyCacheManager, size, legacy_ops)
+        lru = measure(LRUCacheAdapter, size, 20_000)
+        print(f"{size:>10,} | {legacy:>14.2f} | {lru:>16.2f}")
+
+if __name__ == "__main__":
+    main()
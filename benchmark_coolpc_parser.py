@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""原價屋價格表解析效能測試：比較舊版多次正則掃描與單次串流掃描
+
+用法：python benchmark_coolpc_parser.py [已儲存的 evaluate.php]
+未指定檔案時嘗試下載真實價格表，無法連線時改用合成頁面。
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.scrapers.coolpc import CATALOG_TOKEN_PATTERN, CoolPCScraper
+
+class LegacyCatalogParser:
+    """舊版解析方式（JavaScript 數組、選項名稱、分類各自完整掃描一次頁面，用於對照）"""
+
+    def __init__(self, scraper: CoolPCScraper):
+        self.scraper = scraper
+
+    def parse_js_arrays(self, html: str) -> Dict[str, List]:
+        arrays = {}
+        patterns = [
+            r'c(\d+)=\[([\d,]+)\]',
+            r'g(\d+)=\[([\d\.,]+)\]',
+            r'Header=\[([\d\[\],]+)\]',
+        ]
+        for pattern in patterns:
+            for match in re.findall(pattern, html):
+                if len(match) == 2:
+                    array_name = f"c{match[0]}" if pattern.startswith('c') else f"g{match[0]}"
+                    arrays[array_name] = [float(x) if x and x != '0' else 0 for x in match[1].split(',')]
+        return arrays
+
+    def extract_product_names(self, html: str) -> Dict[str, str]:
+        products = {}
+        option_pattern = r'<OPTION[^>]*value=(\d+)[^>]*>([^<]+)</OPTION>'
+        for value, text in re.findall(option_pattern, html, re.IGNORECASE | re.DOTALL):
+            text = text.strip()
+            if text and '$' in text and len(text) > 10:
+                products[value] = re.sub(r'\s+', ' ', text)
+        return products
+
+    def parse_catalog(self, html: str) -> List[Dict[str, Any]]:
+        records = []
+        select_pattern = re.compile(r'<SELECT[^>]*name=n?(\d+)[^>]*>(.*?)</SELECT>', re.IGNORECASE | re.DOTALL)
+        label_pattern = re.compile(r'<TD[^>]*>([^<]+)</TD>\s*<TD[^>]*>\s*$', re.IGNORECASE)
+        option_pattern = re.compile(r'<OPTION[^>]*value=(\d+)[^>]*>([^<]*)</OPTION>', re.IGNORECASE | re.DOTALL)
+
+        previous_end = 0
+        for select_match in select_pattern.finditer(html):
+            label_match = label_pattern.search(html[max(previous_end, select_match.start() - 500):select_match.start()])
+            category = label_match.group(1).strip() if label_match else f"n{select_match.group(1)}"
+            previous_end = select_match.end()
+            for value, text in option_pattern.findall(select_match.group(2)):
+                text = text.strip()
+                price_match = re.search(r'\$(\d+)', text)
+                if not price_match:
+                    continue
+                clean_name = self.scraper._clean_product_name(re.sub(r',?\s*\$\d+.*$', '', text).strip())
+                if clean_name:
+                    records.append({
+                        'name': clean_name,
+                        'price': float(price_match.group(1)),
+                        'option_value': value,
+                        'category': category,
+                        'is_bundle': self.scraper._is_bundle_product(clean_name)
+                    })
+        return records
+
+    def scan(self, html: str):
+        """只執行舊版的各次正則掃描（不建立商品記錄）"""
+        re.findall(r'<SELECT[^>]*name=n?(\d+)[^>]*>(.*?)</SELECT>', html, re.IGNORECASE | re.DOTALL)
+        re.findall(r'<OPTION[^>]*value=(\d+)[^>]*>([^<]+)</OPTION>', html, re.IGNORECASE | re.DOTALL)
+        for pattern in (r'c(\d+)=\[([\d,]+)\]', r'g(\d+)=\[([\d\.,]+)\]', r'Header=\[([\d\[\],]+)\]'):
+            re.findall(pattern, html)
+
+    def parse(self, html: str):
+        return self.parse_catalog(html), self.parse_js_arrays(html), self.extract_product_names(html)
+
+def synthetic_page(products: int = 12_000) -> str:
+    """產生與原價屋價格表結構相同的合成頁面"""
+    random.seed(1)
+    categories = ["處理器 CPU", "主機板 MB", "記憶體 RAM", "固態硬碟 SSD", "顯示卡 VGA", "電源供應器 PSU"]
+    models = ["RTX 4070 SUPER", "RX7800XT", "i7-14700K", "Ryzen 7 7800X3D", "DDR5 6000 32GB", "華碩 TUF", "微星 B650"]
+    per_category = products // len(categories)
+    parts = ["<html><body><TABLE>"]
+    for category_id, category in enumerate(categories, start=4):
+        parts.append(f"<TR><TD class=t>{category_id - 3}</TD><TD class=w>{category}</TD><TD><SELECT name=n{category_id} class=s>")
+        parts.append(f"<OPTION value=0>{category}</OPTION><OPTGROUP label='{category}'>")
+        for i in range(per_category):
+            bundle = " [專案]" if i % 9 == 0 else ""
+            parts.append(f"<OPTION value={category_id * 100_000 + i}>{random.choice(models)} 型號{i}{bundle}, ${1000 + i} ◆</OPTION>")
+        parts.append("</OPTGROUP></SELECT></TD></TR>")
+    parts.append("</TABLE><script>")
+    for category_id in range(4, 4 + len(categories)):
+        prices = ",".join(str(1000 + i) for i in range(per_category))
+        parts.append(f"c{category_id}=[{prices}];g{category_id}=[{prices}];")
+    parts.append("</script></body></html>")
+    return "\n".join(parts)
+
+async def download_page(scraper: CoolPCScraper) -> str:
+    async with scraper:
+        return await scraper._fetch_page(scraper.evaluate_url) or ""
+
+def measure(parse, html: str, rounds: int) -> float:
+    """量測完整解析一次頁面的平均毫秒數"""
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        parse(html)
+    return (time.perf_counter() - started_at) / rounds * 1000
+
+def main():
+    scraper = CoolPCScraper()
+    source = "合成頁面"
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        source = sys.argv[1]
+    else:
+        try:
+            html = asyncio.run(download_page(scraper))
+            source = scraper.evaluate_url
+        except Exception as e:
+            print(f"無法下載價格表（{e}）")
+            html = ""
+        if not html:
+            html = synthetic_page()
+            source = "合成頁面"
+
+    legacy = LegacyCatalogParser(scraper)
+    legacy_records, legacy_arrays, _ = legacy.parse(html)
+    records, arrays = scraper._tokenize_catalog(html)
+    print(f"來源: {source} ({len(html) / 1024:.0f} KiB)")
+    print(f"商品數: 舊版 {len(legacy_records):,} / 單次掃描 {len(records):,}，JavaScript 數組: 舊版 {len(legacy_arrays)} / 單次掃描 {len(arrays)}")
+
+    rounds = 10
+    legacy_scan_ms = measure(legacy.scan, html, rounds)
+    tokenizer_scan_ms = measure(lambda page: sum(1 for _ in CATALOG_TOKEN_PATTERN.finditer(page)), html, rounds)
+    print(f"{'僅掃描':>12}: 舊版 {legacy_scan_ms:8.1f} ms / 單次掃描 {tokenizer_scan_ms:8.1f} ms")
+
+    legacy_ms = measure(legacy.parse, html, rounds)
+    tokenizer_ms = measure(scraper._tokenize_catalog, html, rounds)
+    print(f"{'完整解析':>12}: 舊版 {legacy_ms:8.1f} ms / 單次掃描 {tokenizer_ms:8.1f} ms ({legacy_ms / tokenizer_ms:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""相似度演算法效能與相關性測試：以 SequenceMatcher 的結果為基準，比較各演算法的排序一致性與耗時"""
+
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.product_matcher import ProductMatcher
+from app.utils.similarity import SIMILARITY_KERNELS
+
+QUERIES = ["RTX 4070 SUPER", "rtx4090", "7800X3D", "B650", "DDR5 32GB", "華碩 TUF", "i7-14700K", "990 PRO 2TB", "850W 金牌"]
+THRESHOLD = 0.2
+TOP_N = 20
+
+def product_names(count: int = 6000) -> List[str]:
+    """產生測試用商品名稱：一般零件名稱與欣亞、原價屋常見的長組合商品名稱"""
+    random.seed(7)
+    brands = ["華碩", "微星", "技嘉", "華擎", "ASUS", "MSI", "GIGABYTE", "金士頓", "美光", "Samsung", "海盜船"]
+    parts = [
+        "RTX 4070 SUPER 12GB", "RTX 4090 24GB", "RX 7800 XT 16GB", "i7-14700K", "i9-14900K", "Ryzen 7 7800X3D",
+        "Ryzen 5 7600", "B650M-A WIFI", "Z790 GAMING", "DDR5 6000 32GB(16G*2)", "DDR4 3200 16GB",
+        "990 PRO 2TB M.2 PCIe 4.0", "NV2 1TB", "850W 金牌 全模組", "1000W 白金", "TUF GAMING", "ROG STRIX"
+    ]
+    names = []
+    for i in range(count):
+        if i % 5 == 0:
+            # 長組合商品名稱
+            combo = " + ".join(f"{random.choice(brands)} {random.choice(parts)}" for _ in range(random.randint(3, 6)))
+            names.append(f"[專案] {combo} 限量組合價 送好禮")
+        else:
+            names.append(f"{random.choice(brands)} {random.choice(parts)} {random.choice(['三年保固', '', '盒裝', '代理商貨'])}".strip())
+    return names
+
+def spearman(baseline: Dict[str, float], candidate: Dict[str, float]) -> float:
+    """兩組分數的 Spearman 等級相關係數（同分取平均名次）"""
+    names = list(baseline)
+
+    def ranks(scores: Dict[str, float]) -> Dict[str, float]:
+        ordered = sorted(names, key=lambda name: scores[name])
+        result, start = {}, 0
+        while start < len(ordered):
+            end = start
+            while end + 1 < len(ordered) and scores[ordered[end + 1]] == scores[ordered[start]]:
+                end += 1
+            for name in ordered[start:end + 1]:
+                result[name] = (start + end) / 2
+            start = end + 1
+        return result
+
+    baseline_ranks, candidate_ranks = ranks(baseline), ranks(candidate)
+    count = len(names)
+    mean = (count - 1) / 2
+    covariance = sum((baseline_ranks[n] - mean) * (candidate_ranks[n] - mean) for n in names)
+    variance_a = sum((baseline_ranks[n] - mean) ** 2 for n in names)
+    variance_b = sum((candidate_ranks[n] - mean) ** 2 for n in names)
+    return covariance / (variance_a * variance_b) ** 0.5 if variance_a and variance_b else 1.0
+
+def main():
+    names = list(dict.fromkeys(product_names()))
+    print(f"商品數: {len(names):,}，查詢數: {len(QUERIES)}，相關性門檻: {THRESHOLD}")
+    print(f"{'演算法':>10} | {'演算法本身 (ms)':>14} | {'完整評分 (ms)':>14} | {'加速':>6} | {'Spearman':>8} | {f'前{TOP_N}重疊':>8} | {'相關集合 Jaccard':>16}")
+    print("-" * 100)
+
+    normalized_names = [ProductMatcher().normalize_search_term(name) for name in names]
+    baseline_scores, baseline_relevant, baseline_top, baseline_ms = {}, {}, {}, None
+    for kernel_name in SIMILARITY_KERNELS:
+        matcher = ProductMatcher(similarity_kernel=kernel_name)
+        elapsed, kernel_elapsed, correlations, overlaps, agreements = 0.0, 0.0, [], [], []
+        for query in QUERIES:
+            compiled = matcher.compile_query(query)
+            started_at = time.perf_counter()
+            for name in normalized_names:
+                compiled.similarity(name)
+            kernel_elapsed += time.perf_counter() - started_at
+
+            started_at = time.perf_counter()
+            scores = {name: compiled.score(name) for name in names}
+            elapsed += time.perf_counter() - started_at
+
+            relevant = {name for name, score in scores.items() if score >= THRESHOLD}
+            top = set(sorted(names, key=lambda name: scores[name], reverse=True)[:TOP_N])
+            if kernel_name == "sequence":
+                baseline_scores[query], baseline_relevant[query], baseline_top[query] = scores, relevant, top
+            correlations.append(spearman(baseline_scores[query], scores))
+            overlaps.append(len(top & baseline_top[query]) / TOP_N)
+            union = relevant | baseline_relevant[query]
+            agreements.append(len(relevant & baseline_relevant[query]) / len(union) if union else 1.0)
+
+        per_query_ms = elapsed / len(QUERIES) * 1000
+        kernel_ms = kernel_elapsed / len(QUERIES) * 1000
+        baseline_ms = baseline_ms or kernel_ms
+        print(
+            f"{kernel_name:>10} | {kernel_ms:>14.1f} | {per_query_ms:>14.1f} | {baseline_ms / kernel_ms:>5.1f}x | "
+            f"{sum(correlations) / len(correlations):>8.3f} | {sum(overlaps) / len(overlaps):>8.0%} | "
+            f"{sum(agreements) / len(agreements):>16.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""本機 Redis 協定替身伺服器，供 test_redis_cache_backend.py 與本機開發使用"""
+
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class LocalRespServer:
+    """行程內的 Redis 協定替身伺服器，供本機開發與測試 RedisCacheBackend
+
+    只實作快取用到的指令：PING、AUTH、SELECT、GET、SET（EX / PX / NX）、DEL、
+    EXISTS、SCAN、DBSIZE、FLUSHDB。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler(), bind_and_activate=False)
+        self._server.daemon_threads = True
+        # 預設的 listen backlog 只有 5，多個 worker 同時連線時會被丟棄而逾時
+        self._server.request_queue_size = 128
+        self._server.allow_reuse_address = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> str:
+        """於背景執行緒啟動伺服器，回傳連線URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """停止伺服器"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        command = server._read_command(self.rfile)
+                    except (ConnectionError, ValueError):
+                        return
+                    if command is None:
+                        return
+                    self.wfile.write(server._dispatch(command))
+
+        return Handler
+
+    def _read_command(self, rfile) -> Optional[List[bytes]]:
+        """讀取 RESP 陣列格式的指令"""
+        line = rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # inline 指令（例如 telnet 輸入）
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            header = rfile.readline()
+            if not header.startswith(b"$"):
+                raise ValueError("錯誤的 RESP 格式")
+            data = rfile.read(int(header[1:-2]) + 2)
+            args.append(data[:-2])
+        return args
+
+    def _encode(self, value: Any) -> bytes:
+        """將回應編碼為 RESP"""
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, Exception):
+            return b"-ERR %s\r\n" % str(value).encode("utf-8")
+        if isinstance(value, str):
+            return b"+%s\r\n" % value.encode("utf-8")
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self._encode(item) for item in value)
+        raise TypeError(f"無法編碼的回應: {value!r}")
+
+    def _alive(self, key: bytes, now: float) -> Optional[bytes]:
+        """取得未過期的值，過期時順便刪除"""
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= now:
+            del self.data[key]
+            return None
+        return value
+
+    def _dispatch(self, command: List[bytes]) -> bytes:
+        if not command:
+            return self._encode(ValueError("empty command"))
+        name = command[0].upper().decode("ascii", errors="ignore")
+        args = command[1:]
+        now = time.monotonic()
+        with self._lock:
+            try:
+                if name == "PING":
+                    return self._encode("PONG")
+                if name in ("AUTH", "SELECT"):
+                    return self._encode("OK")
+                if name == "GET":
+                    return self._encode(self._alive(args[0], now))
+                if name == "SET":
+                    return self._encode(self._set(args, now))
+                if name == "DEL":
+                    return self._encode(self._delete(args, now))
+                if name == "EXISTS":
+                    return self._encode(sum(1 for key in args if self._alive(key, now) is not None))
+                if name == "SCAN":
+                    return self._encode(self._scan(args, now))
+                if name == "DBSIZE":
+                    return self._encode(sum(1 for key in list(self.data) if self._alive(key, now) is not None))
+                if name == "FLUSHDB":
+                    self.data.clear()
+                    return self._encode("OK")
+                return self._encode(ValueError(f"unknown command '{name}'"))
+            except (IndexError, ValueError) as e:
+                return self._encode(ValueError(f"wrong arguments for '{name}': {e}"))
+
+    def _set(self, args: List[bytes], now: float) -> Optional[str]:
+        key, value = args[0], args[1]
+        expires_at = None
+        only_if_absent = False
+        options = [arg.upper() for arg in args[2:]]
+        i = 0
+        while i < len(options):
+            if options[i] == b"EX":
+                expires_at = now + float(options[i + 1])
+                i += 2
+            elif options[i] == b"PX":
+                expires_at = now + float(options[i + 1]) / 1000
+                i += 2
+            elif options[i] == b"NX":
+                only_if_absent = True
+                i += 1
+            else:
+                raise ValueError(options[i].decode("ascii", errors="ignore"))
+
+        if only_if_absent and self._alive(key, now) is not None:
+            return None
+        self.data[key] = (value, expires_at)
+        return "OK"
+
+    def _delete(self, keys: List[bytes], now: float) -> int:
+        deleted = 0
+        for key in keys:
+            if self._alive(key, now) is not None:
+                del self.data[key]
+                deleted += 1
+        return deleted
+
+    def _scan(self, args: List[bytes], now: float) -> List[Any]:
+        # 一次回傳所有符合的鍵值（游標固定回到 0）
+        pattern = b"*"
+        options = [arg.upper() for arg in args[1:]]
+        for i, option in enumerate(options):
+            if option == b"MATCH":
+                pattern = args[1 + i + 1]
+        keys = [
+            key for key in list(self.data)
+            if self._alive(key, now) is not None and fnmatch.fnmatchcase(key.decode("utf-8", errors="ignore"), pattern.decode("utf-8", errors="ignore"))
+        ]
+        return [b"0", keys]
@@ -156,9 +156,10 @@ def run_tests():
         # 測試快取
         print("3. 測試快取管理...")
         cache = CacheManager()
-        cache.set("test", {"data": "test"})
-        result = cache.get("test")
+        cache.set_store("test", "test", {"rows": []})
+        result = cache.get_store("test", "test")
         assert result is not None
+        cache.close()
         print("   ✅ 快取功能正常")
         
         # 測試爬蟲初始化
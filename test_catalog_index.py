@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import re
+import sys
+import os
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.catalog_index import CatalogIndex
+
+SAMPLE_NAMES = [
+    "技嘉B650M AORUS ELITE",
+    "華碩TUF-RTX4070-O12G",
+    "金士頓 FURY 16GB DDR5-6000",
+    "WD SN850X 2TB",
+    "RTX 4070 Ti SUPER 16G",
+    "微星 MAG B650 TOMAHAWK WIFI",
+    "Intel i9-14900K【24核/32緒】",
+    "AMD Ryzen 7 7800X3D(8核/16緒)",
+    "Samsung 990 PRO 2TB M.2 PCIe 4.0",
+    "海盜船 RM850e 850W 金牌 全模組",
+    "華擎 Z790 Steel Legend WiFi",
+    "美光 Crucial P3 Plus 1TB",
+    "酷碼 HYPER 212 塔扇",
+    "Lian Li O11 Dynamic EVO 機殼",
+    "ASUS ROG STRIX B760-F GAMING WIFI",
+    "[專案] 技嘉 RTX4060 EAGLE OC 8G + 華碩 B760M",
+]
+
+# 原本逐筆子字串掃描會命中、審查時確認索引遺漏的查詢
+REGRESSION_QUERIES = ["技嘉", "華碩", "B650", "16G", "2T", "4070 T", "i9", "7800", "塔", "金牌"]
+
+def build_index():
+    records = [{"name": name, "option_value": str(i)} for i, name in enumerate(SAMPLE_NAMES)]
+    return CatalogIndex(records), records
+
+def baseline(records, query):
+    """原本的做法：以不分大小寫的正則子字串比對每筆名稱"""
+    pattern = re.compile(re.escape(query), re.IGNORECASE)
+    return {record["option_value"] for record in records if pattern.search(record["name"])}
+
+def matched(index, query):
+    return {record["option_value"] for record in index.search(query)}
+
+def test_regression_queries():
+    """測試短詞彙與中英文相連的名稱都能被索引找到"""
+    index, records = build_index()
+    for query in REGRESSION_QUERIES:
+        expected = baseline(records, query)
+        assert expected, query
+        assert expected <= matched(index, query), query
+
+def test_superset_of_regex_matches():
+    """測試名稱中任意一段子字串作為查詢時，索引結果都包含正則比對的結果"""
+    index, records = build_index()
+    random.seed(20)
+    for _ in range(2000):
+        name = random.choice(SAMPLE_NAMES)
+        start = random.randrange(len(name))
+        query = name[start:start + random.randint(1, 12)]
+        if not index.matcher.canonicalize_query(query):
+            # 只有符號（例如 ")"）的查詢沒有可比對的詞彙
+            continue
+        expected = baseline(records, query)
+        assert expected <= matched(index, query), query
+
+def main():
+    for test in (test_regression_queries, test_superset_of_regex_matches):
+        test()
+        print(f"✓ {test.__doc__}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import sys
+import os
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.scrapers.coolpc import CoolPCScraper
+from app.utils.product_matcher import OTHER_CATEGORY
+from app.utils.result_index import ResultIndex, encode_products
+
+CATALOG_PAGE = """<TABLE>
+<TR><TD class=t>1</TD><TD class=w>顯示卡 VGA</TD><TD><SELECT name=n12 class=s>
+<OPTION value=0>顯示卡 VGA</OPTION><OPTGROUP label='NVIDIA'>
+<OPTION value=1201>華碩 TUF RTX4070 SUPER 12G, $21990 ◆</OPTION>
+</OPTGROUP></SELECT></TD></TR>
+<TR><TD class=t>2</TD><TD class=w>網路設備 / 周邊配件</TD><TD><SELECT name=n30 class=s>
+<OPTION value=0>網路設備</OPTION><OPTGROUP label='顯示卡支撐架'>
+<OPTION value=3001>顯示卡支撐架 RTX 通用款, $390 ◆</OPTION>
+</OPTGROUP></SELECT></TD></TR>
+</TABLE>"""
+
+def product(name, store, category):
+    return {
+        "store": store, "product_name": name, "price": 1000, "url": "https://example.com",
+        "in_stock": True, "currency": "TWD", "similarity_score": 0.5, "category": category
+    }
+
+def selected_names(index, category):
+    return {json.loads(row)["product_name"] for row in index.select("price", "asc", category=category)}
+
+def test_unmapped_section_is_other():
+    """測試原價屋無法對應的價格表分類標示為 other，而不是 None"""
+    records, _ = CoolPCScraper()._tokenize_catalog(CATALOG_PAGE)
+    categories = {record["option_value"]: record["category_key"] for record in records}
+    assert categories == {"1201": "vga", "3001": OTHER_CATEGORY}
+
+def test_category_filter():
+    """測試分類篩選：相同分類保留、other 排除、商店未提供分類（None）的商品保留"""
+    index = ResultIndex([
+        encode_products([
+            product("華碩 TUF RTX4070 SUPER 12G", "原價屋", "vga"),
+            product("顯示卡支撐架 RTX 通用款", "原價屋", OTHER_CATEGORY),
+            product("Ryzen 7 7800X3D", "原價屋", "cpu")
+        ]),
+        encode_products([product("RTX 4070 SUPER 公版", "欣亞數位", None)])
+    ])
+    assert selected_names(index, "vga") == {"華碩 TUF RTX4070 SUPER 12G", "RTX 4070 SUPER 公版"}
+    assert selected_names(index, "cpu") == {"Ryzen 7 7800X3D", "RTX 4070 SUPER 公版"}
+    assert len(selected_names(index, None)) == 4
+
+def main():
+    for test in (test_unmapped_section_is_other, test_category_filter):
+        test()
+        print(f"✓ {test.__doc__}")
+
+if __name__ == "__main__":
+    main()
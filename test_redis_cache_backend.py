@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import threading
+import time
+
+# 添加專案根目錄到路徑
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.cache_backend import RedisCacheBackend
+from local_resp_server import LocalRespServer
+
+def start_server():
+    """啟動本機 Redis 協定替身伺服器，回傳伺服器與連線URL"""
+    server = LocalRespServer()
+    return server, server.start()
+
+def test_get_set():
+    """測試寫入、讀取、刪除與命中統計"""
+    server, url = start_server()
+    try:
+        backend = RedisCacheBackend(url=url, key_prefix="test:")
+        assert backend.get("missing") is None
+
+        value = {"name": "RTX 4070 SUPER", "price": 19990, "stores": ["原價屋", "欣亞"]}
+        backend.set("product", value, 60)
+        assert backend.get("product") == value
+        assert b"test:product" in server.data
+
+        backend.delete("product")
+        assert backend.get("product") is None
+
+        stats = backend.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 2 and stats["errors"] == 0
+        backend.close()
+    finally:
+        server.stop()
+
+def test_px_expiry():
+    """測試 TTL 以毫秒（PX）傳送，不足一秒的 TTL 也會過期"""
+    server, url = start_server()
+    try:
+        backend = RedisCacheBackend(url=url, key_prefix="test:")
+        backend.set("short", "value", 0.2)
+        backend.set("long", "value", 60)
+        assert backend.get("short") == "value"
+
+        time.sleep(0.3)
+        assert backend.get("short") is None
+        assert backend.get("long") == "value"
+        backend.close()
+    finally:
+        server.stop()
+
+def test_set_if_absent_race():
+    """測試多個 worker 同時搶同一個租約時只有一個成功，租約過期後可再次取得"""
+    server, url = start_server()
+    try:
+        workers = [RedisCacheBackend(url=url, key_prefix="test:") for _ in range(8)]
+        barrier = threading.Barrier(len(workers))
+        results = []
+
+        def acquire(backend: RedisCacheBackend, worker_id: int):
+            barrier.wait()
+            results.append((worker_id, backend.set_if_absent("lease", worker_id, 0.3)))
+
+        threads = [threading.Thread(target=acquire, args=(backend, i)) for i, backend in enumerate(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        winners = [worker_id for worker_id, acquired in results if acquired]
+        assert len(results) == len(workers)
+        assert len(winners) == 1
+        assert workers[0].get("lease") == winners[0]
+
+        time.sleep(0.4)
+        assert workers[0].set_if_absent("lease", "again", 60)
+        for backend in workers:
+            backend.close()
+    finally:
+        server.stop()
+
+def test_clear_keeps_other_prefixes():
+    """測試 clear() 只刪除本身前綴的鍵值"""
+    server, url = start_server()
+    try:
+        backend = RedisCacheBackend(url=url, key_prefix="test:")
+        other = RedisCacheBackend(url=url, key_prefix="other:")
+        for i in range(1200):
+            backend.set(f"key{i}", i, 60)
+        other.set("key0", "keep", 60)
+        assert len(backend) == 1200
+
+        backend.clear()
+        assert len(backend) == 0
+        assert backend.get("key0") is None
+        assert other.get("key0") == "keep"
+        assert list(server.data) == [b"other:key0"]
+        backend.close()
+        other.close()
+    finally:
+        server.stop()
+
+def main():
+    for test in (test_get_set, test_px_expiry, test_set_if_absent_race, test_clear_keeps_other_prefixes):
+        test()
+        print(f"✓ {test.__doc__}")
+
+if __name__ == "__main__":
+    main()